@@ -0,0 +1,110 @@
+# CanvasExporter.py
+import os
+import threading
+import cv2
+
+# Output formats: file extension and the OpenCV parameter controlling size/quality
+FORMATS = {
+    'png': ('.png', cv2.IMWRITE_PNG_COMPRESSION),  # 0 (fast, large) .. 9 (slow, small)
+    'jpg': ('.jpg', cv2.IMWRITE_JPEG_QUALITY),  # 0 .. 100
+    'webp': ('.webp', cv2.IMWRITE_WEBP_QUALITY),  # 1 .. 100, above 100 is lossless
+}
+
+DEFAULT_QUALITY = {'png': 1, 'jpg': 95, 'webp': 90}
+
+
+class CanvasExporter:
+    """Writes canvas exports on a background thread.
+
+    ``submit`` only queues a reference to the snapshot and returns, so the
+    frame loop never waits for rendering or encoding. Requests that arrive
+    while an export is running are merged: only the newest pending snapshot
+    is written. ``on_done(path, error)`` is called on the writer thread after
+    each export.
+    """
+
+    def __init__(self, render=None, fmt='png', quality=None, on_done=None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        self.render = render  # render(snapshot) -> BGR image, run on the writer thread
+        self.fmt = fmt
+        self.quality = quality if quality is not None else DEFAULT_QUALITY[fmt]
+        self.on_done = on_done
+
+        self.condition = threading.Condition()
+        self.pending = None  # (snapshot, base path) waiting to be written
+        self.busy = False
+        self.merged = 0  # Requests replaced by a newer one before being written
+        self.thread = None
+        self.running = False
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.thread = threading.Thread(target=self._run, name="CanvasExporter", daemon=True)
+            self.thread.start()
+        return self
+
+    def submit(self, snapshot, base_path):
+        """Queue ``snapshot`` for export to ``base_path`` plus the format's extension.
+
+        Returns the path that will be written.
+        """
+        self.start()
+        with self.condition:
+            if self.pending is not None:
+                self.merged += 1
+            self.pending = (snapshot, base_path)
+            self.condition.notify_all()
+        return base_path + FORMATS[self.fmt][0]
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.running and self.pending is None:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                snapshot, base_path = self.pending
+                self.pending = None
+                self.busy = True
+
+            path, error = base_path + FORMATS[self.fmt][0], None
+            try:
+                self.write(snapshot, path)
+            except Exception as e:
+                error = e
+
+            with self.condition:
+                self.busy = False
+                self.condition.notify_all()
+            if self.on_done is not None:
+                self.on_done(path, error)
+
+    def write(self, snapshot, path):
+        img = self.render(snapshot) if self.render is not None else snapshot
+        ext, param = FORMATS[self.fmt]
+        success, data = cv2.imencode(ext, img, [param, self.quality])
+        if not success:
+            raise IOError(f"Could not encode {path}")
+        # Write next to the target and rename, so a half-written file is never visible
+        tmp_path = path + '.part'
+        with open(tmp_path, 'wb') as f:
+            f.write(data.tobytes())
+        os.replace(tmp_path, path)
+
+    def flush(self, timeout=None):
+        """Wait until every queued export has been written."""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.pending is None and not self.busy, timeout)
+
+    def stop(self, flush=True):
+        if not self.running:
+            return
+        if flush:
+            self.flush(timeout=10.0)
+        with self.condition:
+            self.running = False
+            self.pending = None
+            self.condition.notify_all()
+        self.thread.join(timeout=1.0)
@@ -0,0 +1,142 @@
+# DetectorPool.py
+import threading
+from collections import OrderedDict
+import numpy as np
+import streamlit as st
+import HandTrackingModule as htm
+from StreamlitSession import current_session_id, is_active_session
+
+# Detector settings used by the painter pages; warmed when the server starts
+PAINTER_DETECTOR = {'detectionCon': 0.85, 'roiTracking': True, 'inferenceScale': 0.5, 'detectInterval': 2}
+
+
+def _params_key(params):
+    return tuple(sorted(params.items()))
+
+
+class DetectorPool:
+    """Process-wide cache of warm handDetectors, keyed by their parameters.
+
+    Building a MediaPipe Hands graph and running its first frame dominates
+    rerun and page-switch latency, so detectors are built once, warmed with
+    a dummy frame and lent to sessions. A session keeps its detector across
+    reruns; when the session ends its detector goes back to the idle list.
+    Idle detectors are capped per parameter set and in total; past the
+    total the least recently idled one is closed.
+    """
+
+    def __init__(self, max_idle=2, max_idle_total=4, warm_size=(1280, 720)):
+        self.max_idle = max_idle  # Idle detectors kept per parameter set
+        self.max_idle_total = max_idle_total  # Idle detectors kept across all parameter sets
+        self.warm_size = warm_size
+        self.lock = threading.Lock()
+        self.idle = {}  # params key -> [handDetector]
+        self.idle_order = OrderedDict()  # id(handDetector) -> params key, oldest first
+        self.leases = {}  # session id -> (params key, handDetector)
+
+    def _create(self, params):
+        detector = htm.handDetector(**params)
+        # The first process() call loads the model; pay for it now
+        w, h = self.warm_size
+        detector.findHands(np.zeros((h, w, 3), dtype=np.uint8), draw=False)
+        detector.resetTracking()
+        return detector
+
+    def prewarm(self, count=1, **params):
+        key = _params_key(params)
+        with self.lock:
+            missing = count - len(self.idle.get(key, []))
+        for _ in range(missing):
+            detector = self._create(params)
+            with self.lock:
+                evicted = self._add_idle(key, detector)
+            self._close(evicted)
+
+    def _add_idle(self, key, detector):
+        # Must be called with the lock held; returns the detectors to close
+        idle = self.idle.get(key, [])
+        if len(idle) >= self.max_idle:
+            return [detector]
+        self.idle[key] = idle
+        idle.append(detector)
+        self.idle_order[id(detector)] = key
+
+        evicted = []
+        while len(self.idle_order) > self.max_idle_total:
+            old_id, old_key = self.idle_order.popitem(last=False)
+            old_list = self.idle[old_key]
+            old = next(d for d in old_list if id(d) == old_id)
+            old_list.remove(old)
+            if not old_list:
+                del self.idle[old_key]
+            evicted.append(old)
+        return evicted
+
+    def _take_idle(self, key):
+        # Must be called with the lock held
+        idle = self.idle.get(key)
+        if not idle:
+            return None
+        detector = idle.pop()
+        if not idle:
+            del self.idle[key]
+        del self.idle_order[id(detector)]
+        return detector
+
+    @staticmethod
+    def _close(detectors):
+        for detector in detectors:
+            detector.hands.close()
+
+    def acquire(self, session_id, **params):
+        """Detector for a session, reusing its current one if the parameters match."""
+        key = _params_key(params)
+        with self.lock:
+            lease = self.leases.get(session_id)
+            if lease is not None and lease[0] == key:
+                return lease[1]
+        if lease is not None:
+            self.release(session_id)
+
+        with self.lock:
+            detector = self._take_idle(key)
+        if detector is None:
+            detector = self._create(params)
+
+        with self.lock:
+            self.leases[session_id] = (key, detector)
+        return detector
+
+    def release(self, session_id):
+        """Return a session's detector to the idle list, closing whatever no longer fits."""
+        with self.lock:
+            lease = self.leases.pop(session_id, None)
+            if lease is None:
+                return
+            key, detector = lease
+            detector.resetTracking()
+            evicted = self._add_idle(key, detector)
+        self._close(evicted)
+
+    def reap(self, is_active):
+        """Release the detectors of sessions for which ``is_active(session_id)`` is False."""
+        with self.lock:
+            ended = [session_id for session_id in self.leases if not is_active(session_id)]
+        for session_id in ended:
+            self.release(session_id)
+
+
+@st.cache_resource
+def get_detector_pool():
+    # Created once per server process; warming runs in the background so the
+    # first page still renders immediately
+    pool = DetectorPool()
+    threading.Thread(target=pool.prewarm, kwargs=PAINTER_DETECTOR, name="DetectorPrewarm", daemon=True).start()
+    return pool
+
+
+def session_detector(**params):
+    """Warm detector for the current Streamlit session, kept across reruns."""
+    pool = get_detector_pool()
+    pool.reap(is_active_session)
+    return pool.acquire(current_session_id(), **params)
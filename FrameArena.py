@@ -0,0 +1,63 @@
+# FrameArena.py
+import sys
+import threading
+import numpy as np
+
+
+def _free_refs():
+    # References to a pooled buffer nobody else holds, as counted in FrameArena.take:
+    # the pool list and getrefcount's own argument
+    pool = [np.empty(1)]
+    return sys.getrefcount(pool[0])
+
+
+FREE_REFS = _free_refs()
+
+
+class FrameArena:
+    """Reusable frame-sized buffers for OpenCV ``dst`` arguments.
+
+    ``take(name, shape)`` returns a buffer of that shape and dtype that no
+    one else references any more, so a frame handed down a pipeline (or
+    still shown by Streamlit) is never overwritten; a new buffer is only
+    allocated while every pooled one is in use or has another size. In
+    steady state each name holds one buffer per frame in flight and the
+    loop allocates nothing.
+    """
+
+    def __init__(self):
+        self.pools = {}  # name -> list of buffers
+        self.allocations = 0
+        self.lock = threading.Lock()
+
+    def take(self, name, shape, dtype=np.uint8):
+        shape, dtype = tuple(shape), np.dtype(dtype)
+        with self.lock:
+            pool = self.pools.setdefault(name, [])
+            stale = None
+            for i in range(len(pool)):
+                if sys.getrefcount(pool[i]) <= FREE_REFS:
+                    if pool[i].shape == shape and pool[i].dtype == dtype:
+                        return pool[i]
+                    stale = i
+            buf = np.empty(shape, dtype)
+            self.allocations += 1
+            if stale is None:
+                pool.append(buf)
+            else:
+                # Replace a free buffer of another size (e.g. a resized ROI crop)
+                pool[stale] = buf
+            return buf
+
+    def like(self, name, img):
+        """Buffer with the shape and dtype of ``img``."""
+        return self.take(name, img.shape, img.dtype)
+
+    @property
+    def nbytes(self):
+        with self.lock:
+            return sum(buf.nbytes for pool in self.pools.values() for buf in pool)
+
+    def clear(self):
+        with self.lock:
+            self.pools.clear()
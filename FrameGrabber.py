@@ -0,0 +1,100 @@
+# FrameGrabber.py
+import threading
+import time
+from collections import deque
+
+
+class FrameGrabber:
+    """Reads frames on a background thread into a small ring buffer.
+
+    The ring buffer always holds the newest frames the camera delivered, so the
+    painter loop never waits on camera I/O and never works through a backlog of
+    frames that queued up while it was busy with inference.
+    """
+
+    def __init__(self, cap, buffer_size=2, max_age=None):
+        self.cap = cap
+        self.buffer = deque(maxlen=buffer_size)  # (frame_id, timestamp, img)
+        self.max_age = max_age  # seconds; older frames are treated as stale
+        self.frame_id = 0
+        self.last_read_id = 0
+        self.skipped = 0  # Frames that were never handed to the loop
+        self.read_failures = 0
+        self.running = False
+        self.thread = None
+        self.condition = threading.Condition()
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._reader, name="FrameGrabber", daemon=True)
+        self.thread.start()
+        return self
+
+    def _reader(self):
+        while self.running:
+            success, img = self.cap.read()
+            if not success:
+                self.read_failures += 1
+                time.sleep(0.005)
+                continue
+
+            with self.condition:
+                self.frame_id += 1
+                self.buffer.append((self.frame_id, time.time(), img))
+                self.condition.notify_all()
+
+    def _newest(self):
+        # Must be called with the condition held
+        if not self.buffer:
+            return None
+        entry = self.buffer[-1]
+        if self.max_age is not None and time.time() - entry[1] > self.max_age:
+            return None
+        return entry
+
+    def read(self, timeout=1.0):
+        """Return the newest frame not handed out yet, skipping stale ones.
+
+        Mirrors ``cv2.VideoCapture.read`` and returns ``(success, img)``.
+        Waits up to ``timeout`` seconds for a new frame to arrive.
+        """
+        deadline = time.time() + timeout
+        with self.condition:
+            while True:
+                entry = self._newest()
+                if entry is not None and entry[0] > self.last_read_id:
+                    frame_id, _, img = entry
+                    self.skipped += frame_id - self.last_read_id - 1
+                    self.last_read_id = frame_id
+                    return True, img
+
+                remaining = deadline - time.time()
+                if not self.running or remaining <= 0:
+                    return False, None
+                self.condition.wait(remaining)
+
+    def read_latest(self):
+        """Return the newest buffered frame without waiting, even if it was already read."""
+        with self.condition:
+            entry = self._newest()
+            if entry is None:
+                return False, None
+            self.last_read_id = max(self.last_read_id, entry[0])
+            return True, entry[2]
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def stop(self):
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+        self.thread = None
+
+    def release(self):
+        self.stop()
+        self.cap.release()
@@ -0,0 +1,197 @@
+# FrameSources.py
+import os
+import time
+import cv2
+import numpy as np
+
+# Every source follows the cv2.VideoCapture interface the painter already uses:
+# read() -> (success, img), isOpened() and release()
+
+
+class CameraSource:
+    """Live webcam."""
+
+    def __init__(self, index=0, width=1280, height=720):
+        self.cap = cv2.VideoCapture(index)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+    def read(self):
+        return self.cap.read()
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource:
+    """Recorded video file, optionally looped and paced at the file's frame rate."""
+
+    def __init__(self, path, loop=True, realtime=False, size=(1280, 720)):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Video file not found: {path}")
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime
+        self.size = size
+        self.cap = cv2.VideoCapture(path)
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.frame_interval = 1.0 / fps if fps and fps > 0 else 1.0 / 30
+        self.last_read = 0.0
+
+    def read(self):
+        if self.realtime:
+            wait = self.frame_interval - (time.time() - self.last_read)
+            if wait > 0:
+                time.sleep(wait)
+            self.last_read = time.time()
+
+        success, img = self.cap.read()
+        if not success and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, img = self.cap.read()
+        if success and self.size is not None and (img.shape[1], img.shape[0]) != tuple(self.size):
+            img = cv2.resize(img, self.size)
+        return success, img
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+# Open right hand, pointing up, relative to the index fingertip (landmark 8).
+# Each finger is listed extended and curled; ids follow MediaPipe's hand model.
+_PALM = {0: (40, 200), 1: (0, 170), 5: (0, 100), 9: (30, 95), 13: (60, 100), 17: (88, 110)}
+_FINGERS = {
+    # finger: ((ids), extended offsets, curled offsets)
+    'thumb': ((2, 3, 4), ((-30, 140), (-55, 115), (-45, 90)), ((-15, 140), (5, 125), (0, 120))),
+    'index': ((6, 7, 8), ((0, 55), (0, 25), (0, 0)), ((0, 60), (5, 85), (8, 105))),
+    'middle': ((10, 11, 12), ((32, 48), (33, 18), (34, -8)), ((32, 55), (36, 80), (38, 100))),
+    'ring': ((14, 15, 16), ((62, 55), (64, 28), (65, 5)), ((62, 60), (65, 85), (66, 105))),
+    'pinky': ((18, 19, 20), ((90, 70), (92, 48), (93, 30)), ((90, 72), (92, 92), (93, 110))),
+}
+_FINGER_ORDER = ('thumb', 'index', 'middle', 'ring', 'pinky')
+_CONNECTIONS = [(0, 1), (1, 2), (2, 3), (3, 4), (0, 5), (5, 6), (6, 7), (7, 8), (5, 9), (9, 10),
+                (10, 11), (11, 12), (9, 13), (13, 14), (14, 15), (15, 16), (13, 17), (17, 18),
+                (18, 19), (19, 20), (0, 17)]
+
+# Finger states per scripted gesture, in fingersUp() order
+GESTURES = {
+    'draw': (0, 1, 0, 0, 0),  # Index finger only
+    'select': (0, 1, 1, 0, 0),  # Index and middle fingers
+    'idle': (0, 0, 0, 0, 0),  # Fist
+}
+
+
+def default_script():
+    """Pick a color in the header, draw a loop, rest, then draw a second stroke."""
+    loop = [(640 + int(250 * np.sin(t)), 420 + int(150 * np.sin(2 * t)))
+            for t in np.linspace(0, 2 * np.pi, 13)]
+    return [
+        {'gesture': 'select', 'path': [(320, 400), (320, 60)], 'frames': 20},
+        {'gesture': 'select', 'path': [(320, 60), (640, 420)], 'frames': 15},
+        {'gesture': 'draw', 'path': loop, 'frames': 120},
+        {'gesture': 'idle', 'path': [(640, 420), (400, 300)], 'frames': 15},
+        {'gesture': 'draw', 'path': [(400, 300), (900, 300), (900, 600)], 'frames': 60},
+    ]
+
+
+class SyntheticHandSource:
+    """Renders a hand-like figure whose index fingertip follows a scripted path.
+
+    Frames are deterministic, so runs can be compared across machines. The
+    scripted landmarks and finger states for the last frame are exposed as
+    ``landmarks`` (``findPosition`` format) and ``fingers`` (``fingersUp``
+    format), in the coordinates of the painter's mirrored view.
+    """
+
+    def __init__(self, width=1280, height=720, script=None, n_frames=None, mirrored=True, fps=None):
+        self.width = width
+        self.height = height
+        self.script = script if script is not None else default_script()
+        self.n_frames = n_frames  # None repeats the script forever
+        self.mirrored = mirrored
+        self.frame_interval = 1.0 / fps if fps else 0.0  # 0 renders as fast as possible
+        self.last_read = 0.0
+        self.frame_index = 0
+        self.opened = True
+        self.landmarks = []
+        self.fingers = []
+
+        # Static backdrop so frames look roughly like a room rather than a flat color
+        gradient = np.linspace(60, 140, height, dtype=np.uint8)[:, None]
+        self.background = np.dstack([np.repeat(gradient, width, axis=1)] * 3)
+        cv2.rectangle(self.background, (0, height - 180), (width, height), (70, 90, 110), cv2.FILLED)
+
+        # Precompute (gesture, tip position) for every frame of one script pass
+        self.timeline = []
+        for step in self.script:
+            points = np.asarray(step['path'], dtype=np.float32)
+            frames = step['frames']
+            # Distance along the path, so the tip moves at a constant speed
+            seg = np.hypot(*np.diff(points, axis=0).T) if len(points) > 1 else np.zeros(0)
+            dist = np.concatenate([[0], np.cumsum(seg)])
+            targets = np.linspace(0, dist[-1], frames)
+            xs = np.interp(targets, dist, points[:, 0])
+            ys = np.interp(targets, dist, points[:, 1])
+            for x, y in zip(xs, ys):
+                self.timeline.append((step['gesture'], int(x), int(y)))
+
+    def scripted_hand(self, frame_index):
+        """Landmarks and finger states for a frame, without rendering it."""
+        gesture, tx, ty = self.timeline[frame_index % len(self.timeline)]
+        fingers = list(GESTURES[gesture])
+        points = dict(_PALM)
+        for name, up in zip(_FINGER_ORDER, fingers):
+            ids, extended, curled = _FINGERS[name]
+            points.update(zip(ids, extended if up else curled))
+        landmarks = [[id, tx + points[id][0], ty + points[id][1]] for id in range(21)]
+        return landmarks, fingers
+
+    def read(self):
+        if not self.opened or (self.n_frames is not None and self.frame_index >= self.n_frames):
+            return False, None
+
+        if self.frame_interval:
+            wait = self.frame_interval - (time.time() - self.last_read)
+            if wait > 0:
+                time.sleep(wait)
+            self.last_read = time.time()
+
+        self.landmarks, self.fingers = self.scripted_hand(self.frame_index)
+        self.frame_index += 1
+
+        img = self.background.copy()
+        pts = [(x, y) for _, x, y in self.landmarks]
+        palm = np.array([pts[i] for i in (0, 1, 5, 9, 13, 17)], dtype=np.int32)
+        cv2.fillConvexPoly(img, cv2.convexHull(palm), (120, 160, 210))
+        for a, b in _CONNECTIONS:
+            cv2.line(img, pts[a], pts[b], (120, 160, 210), 22)
+        for p in pts:
+            cv2.circle(img, p, 9, (100, 140, 195), cv2.FILLED)
+
+        # A camera sees the mirror image of what the painter displays after cv2.flip
+        if self.mirrored:
+            img = cv2.flip(img, 1)
+        return True, img
+
+    def isOpened(self):
+        return self.opened
+
+    def release(self):
+        self.opened = False
+
+
+def make_source(spec=None):
+    """Build a frame source from a camera index, a video path or ``"synthetic"``."""
+    if spec is None:
+        return CameraSource(0)
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(int(spec))
+    if spec == "synthetic":
+        return SyntheticHandSource(fps=30)
+    return VideoFileSource(spec)
@@ -0,0 +1,212 @@
+# FrameStreamer.py
+import asyncio
+import os
+import threading
+import cv2
+import streamlit as st
+from tornado.httpserver import HTTPServer
+from tornado.iostream import StreamClosedError
+from tornado.netutil import bind_sockets
+from tornado.web import Application, HTTPError, RequestHandler
+from StreamlitSession import current_session_id, is_active_session
+
+BOUNDARY = "frame"
+
+
+class FrameChannel:
+    """Newest JPEG frame of one painter session and the clients watching it."""
+
+    def __init__(self, streamer, quality, width):
+        self.streamer = streamer
+        self.quality = quality
+        self.width = width  # Stream width in pixels, None for the frame's own size
+        self.frame = (0, None)  # (frame_id, jpeg bytes), replaced as a whole
+        self.clients = 0
+        self.closed = False
+        self.waiters = set()  # Futures on the server loop, woken by each new frame
+
+    def publish(self, img):
+        """JPEG-encode a BGR frame for the stream. Returns False if it was skipped.
+
+        Frames are only encoded while a client is watching (plus the first
+        one, so a new client gets a picture immediately).
+        """
+        frame_id, jpeg = self.frame
+        if self.closed or (self.clients == 0 and jpeg is not None):
+            return False
+        if self.width is not None and img.shape[1] != self.width:
+            h = round(img.shape[0] * self.width / img.shape[1])
+            img = cv2.resize(img, (self.width, h), interpolation=cv2.INTER_AREA)
+        ok, buf = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            return False
+        self.frame = (frame_id + 1, buf.tobytes())
+        self.streamer.call_soon(self._wake)
+        return True
+
+    def close(self):
+        self.closed = True
+        self.streamer.call_soon(self._wake)
+
+    def _wake(self):
+        # Runs on the server loop
+        for waiter in self.waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def next_frame(self, last_id):
+        """Wait for a frame newer than ``last_id``; returns (frame_id, jpeg), or None once closed."""
+        while self.frame[0] == last_id or self.frame[1] is None:
+            if self.closed:
+                return None
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.add(waiter)
+            try:
+                await waiter
+            finally:
+                self.waiters.discard(waiter)
+        return None if self.closed else self.frame
+
+
+class MJPEGHandler(RequestHandler):
+    """Streams a channel as multipart/x-mixed-replace JPEGs, always the newest frame.
+
+    A slow client simply skips the frames published while its last write
+    was still being flushed.
+    """
+
+    def initialize(self, streamer):
+        self.streamer = streamer
+
+    async def get(self, name):
+        channel = self.streamer.channels.get(name)
+        if channel is None:
+            raise HTTPError(404)
+        self.set_header('Content-Type', f'multipart/x-mixed-replace; boundary={BOUNDARY}')
+        self.set_header('Cache-Control', 'no-store')
+
+        channel.clients += 1
+        last_id = 0
+        try:
+            while True:
+                frame = await channel.next_frame(last_id)
+                if frame is None:
+                    break
+                last_id, jpeg = frame
+                self.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                           f"Content-Length: {len(jpeg)}\r\n\r\n".encode())
+                self.write(jpeg)
+                self.write(b"\r\n")
+                await self.flush()
+        except StreamClosedError:
+            pass
+        finally:
+            channel.clients -= 1
+
+
+class FrameStreamer:
+    """Local HTTP server that streams painter frames as MJPEG.
+
+    Each painter session publishes into its own channel, served at
+    ``/stream/<name>.mjpg``; the page embeds that URL in an ``<img>`` tag, so
+    frames reach the browser without going through Streamlit's script
+    reruns. The server runs its own event loop on a background thread.
+    ``public_url`` is the base URL browsers use to reach the server when it
+    is not ``http://<host>:<port>``.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8765, quality=80, width=None, public_url=None):
+        self.host = host
+        self.port = port  # 0 picks a free port
+        self.quality = quality
+        self.width = width
+        self.public_url = public_url
+        self.channels = {}
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        if self.thread is not None:
+            return self
+        # Bind here so a busy port raises in the caller
+        sockets = bind_sockets(self.port, self.host)
+        self.port = sockets[0].getsockname()[1]
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._serve, args=(sockets, ready), name="FrameStreamer", daemon=True)
+        self.thread.start()
+        ready.wait()
+        return self
+
+    def _serve(self, sockets, ready):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        app = Application([(r"/stream/([\w-]+)\.mjpg", MJPEGHandler, {'streamer': self})])
+        self.server = HTTPServer(app)
+        self.server.add_sockets(sockets)
+        ready.set()
+        self.loop.run_forever()
+        self.server.stop()
+        self.loop.close()
+
+    def call_soon(self, callback):
+        # Schedule on the server loop from any thread
+        loop = self.loop
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(callback)
+
+    def channel(self, name):
+        """Channel ``name``, created on first use."""
+        with self.lock:
+            channel = self.channels.get(name)
+            if channel is None:
+                channel = self.channels[name] = FrameChannel(self, self.quality, self.width)
+            return channel
+
+    def remove(self, name):
+        with self.lock:
+            channel = self.channels.pop(name, None)
+        if channel is not None:
+            channel.close()
+
+    def reap(self, is_active):
+        """Remove the channels of sessions for which ``is_active(name)`` is False."""
+        with self.lock:
+            ended = [name for name in self.channels if not is_active(name)]
+        for name in ended:
+            self.remove(name)
+
+    def url(self, name):
+        base = self.public_url or f"http://{'localhost' if self.host in ('', '0.0.0.0') else self.host}:{self.port}"
+        return f"{base.rstrip('/')}/stream/{name}.mjpg"
+
+    def stop(self):
+        for name in list(self.channels):
+            self.remove(name)
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+        self.thread = None
+
+
+@st.cache_resource
+def get_frame_streamer():
+    # One server per Streamlit process, configured from the environment
+    width = os.environ.get('PAINTER_STREAM_WIDTH')
+    return FrameStreamer(
+        host=os.environ.get('PAINTER_STREAM_HOST', '127.0.0.1'),
+        port=int(os.environ.get('PAINTER_STREAM_PORT', 8765)),
+        quality=int(os.environ.get('PAINTER_STREAM_QUALITY', 80)),
+        width=int(width) if width else None,
+        public_url=os.environ.get('PAINTER_STREAM_URL'),
+    ).start()
+
+
+def session_channel():
+    """Stream channel and its URL for the current Streamlit session, kept across reruns."""
+    name = current_session_id()
+    streamer = get_frame_streamer()
+    streamer.reap(is_active_session)
+    return streamer.channel(name), streamer.url(name)
@@ -0,0 +1,65 @@
+# GestureStateMachine.py
+
+# Events returned by GestureStateMachine.update
+ENTER = 'enter'  # Pointer moved onto a region
+FIRE = 'fire'  # Pointer stayed on the region for the dwell time (once per visit)
+EXIT = 'exit'  # Pointer left the region, the header or the selection gesture
+
+
+class GestureStateMachine:
+    """Edge-triggered hover state for the header tool regions.
+
+    ``regions`` is a sequence of ``(x_min, x_max)`` ranges inside the header
+    band (``0 <= y < header_height``). Each frame, ``update`` gets the
+    selection pointer (or None when the selection gesture is not held) and
+    returns ``(event, region_index)`` pairs. A region fires once per visit
+    after ``dwell`` seconds; the pointer must then move ``hysteresis``
+    pixels past the region's edges (or drop the gesture) before the region
+    can fire again, so jitter on a boundary does not repeat the action.
+    """
+
+    def __init__(self, regions, header_height=125, dwell=0.1, hysteresis=16):
+        self.regions = regions
+        self.header_height = header_height
+        self.dwell = dwell
+        self.hysteresis = hysteresis
+
+        self.region = None  # Index of the region under the pointer
+        self.entered_at = 0.0
+        self.fired = False
+
+    def region_at(self, x, y, margin=0):
+        if y >= self.header_height + margin:
+            return None
+        for index, (x_min, x_max) in enumerate(self.regions):
+            if x_min - margin < x < x_max + margin:
+                return index
+        return None
+
+    def _still_inside(self, x, y):
+        x_min, x_max = self.regions[self.region]
+        return y < self.header_height + self.hysteresis and x_min - self.hysteresis < x < x_max + self.hysteresis
+
+    def update(self, pointer, now):
+        """Advance with ``pointer`` = ``(x, y)`` or None at time ``now`` (seconds)."""
+        events = []
+        if self.region is not None and (pointer is None or not self._still_inside(*pointer)):
+            events.append((EXIT, self.region))
+            self.region = None
+
+        if self.region is None and pointer is not None:
+            region = self.region_at(*pointer)
+            if region is not None:
+                self.region = region
+                self.entered_at = now
+                self.fired = False
+                events.append((ENTER, region))
+
+        if self.region is not None and not self.fired and now - self.entered_at >= self.dwell:
+            self.fired = True
+            events.append((FIRE, self.region))
+        return events
+
+    def reset(self):
+        self.region = None
+        self.fired = False
@@ -5,16 +5,47 @@ import mediapipe as mp
 import time
 import streamlit as st
 import numpy as np
+from FrameArena import FrameArena
 
 
 class handDetector:
-    def __init__(self, mode=False, maxHands=2, detectionCon=0.5, trackCon=0.5):
+    def __init__(self, mode=False, maxHands=2, detectionCon=0.5, trackCon=0.5,
+                 roiTracking=False, roiPadding=0.6, roiMinSize=256, roiRefresh=30, roiStep=32,
+                 inferenceScale=1.0, detectInterval=1, detectPeriod=None):
         self.results = None
         self.mode = mode
         self.maxHands = maxHands
         self.detectionCon = detectionCon
         self.trackCon = trackCon
 
+        # ROI tracking: search only a padded box around the previous frame's hands
+        self.roiTracking = roiTracking
+        self.roiPadding = roiPadding  # Padding as a fraction of the hand box size
+        self.roiMinSize = roiMinSize  # Smallest crop side in pixels
+        self.roiRefresh = roiRefresh  # Full-frame search every N frames to pick up new hands
+        self.roiStep = roiStep  # Crop sides are multiples of this, so the crop buffers keep their size
+        self.roi = None  # (x0, y0, x1, y1) in pixels, None means full-frame search
+        self.roiSize = None  # Current crop side before clipping to the frame
+        self.roiFrames = 0
+
+        # MediaPipe runs on a copy downscaled by this factor; landmarks are
+        # normalized, so findPosition still returns full-resolution pixels
+        self.inferenceScale = inferenceScale
+
+        # Frame skipping: run MediaPipe every detectInterval frames, or every
+        # detectPeriod seconds when set, and extrapolate landmarks in between
+        self.detectInterval = detectInterval
+        self.detectPeriod = detectPeriod
+        self.landmarks = None  # (n_hands, 21, 3) normalized landmarks for the current frame
+        self.detected = None  # Landmarks from the last MediaPipe run
+        self.velocity = None  # Per-landmark velocity in normalized units per second
+        self.lastDetect = None
+        self.framesSinceDetect = 0
+        self.predicted = False  # True when landmarks were extrapolated, not detected
+
+        # Reused buffers for the downscaled and RGB copies handed to MediaPipe
+        self.arena = FrameArena()
+
         self.mpHands = mp.solutions.hands
         self.hands = self.mpHands.Hands(
             static_image_mode=self.mode,
@@ -25,49 +56,207 @@ class handDetector:
         self.mpDraw = mp.solutions.drawing_utils
         self.tipIds = [4, 8, 12, 16, 20]
 
-    def findHands(self, img, draw=True):
-        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(imgRGB)
+    def findHands(self, img, draw=True, timestamp=None):
+        now = time.perf_counter() if timestamp is None else timestamp
+        if self._shouldDetect(now):
+            self._detect(img, now)
+        else:
+            self._predict(img, now)
 
-        if self.results.multi_hand_landmarks:
-            for handLms in self.results.multi_hand_landmarks:
-                if draw:
+        if draw and self.landmarks is not None:
+            if self.predicted:
+                h, w = img.shape[:2]
+                for x, y in (self.landmarks[:, :, :2].reshape(-1, 2) * (w, h)).astype(np.int32):
+                    cv2.circle(img, (int(x), int(y)), 4, (0, 0, 255), cv2.FILLED)
+            else:
+                for handLms in self.results.multi_hand_landmarks:
                     self.mpDraw.draw_landmarks(img, handLms,
                                                self.mpHands.HAND_CONNECTIONS)
         return img
 
+    def _shouldDetect(self, now):
+        if self.lastDetect is None:
+            return True
+        if self.detectPeriod is not None:
+            return now - self.lastDetect >= self.detectPeriod
+        return self.framesSinceDetect + 1 >= self.detectInterval
+
+    def _detect(self, img, now):
+        h, w = img.shape[:2]
+        results = None
+
+        if self.roiTracking and self.roi is not None and self.roiFrames < self.roiRefresh:
+            results = self._processRoi(img, w, h)
+            self.roiFrames += 1
+
+        if results is None:
+            # Full-frame search (first frame, tracking lost or periodic refresh)
+            results = self.hands.process(self._inferenceImage(img, 'frame'))
+            self.roiFrames = 0
+
+        self.results = results
+        landmarks = None
+        if results.multi_hand_landmarks:
+            landmarks = np.array([[(lm.x, lm.y, lm.z) for lm in handLms.landmark]
+                                  for handLms in results.multi_hand_landmarks], dtype=np.float32)
+
+        # Constant-velocity model from the last two detections (same number of hands)
+        if (landmarks is not None and self.detected is not None
+                and landmarks.shape == self.detected.shape
+                and self.lastDetect is not None and now > self.lastDetect):
+            self.velocity = (landmarks - self.detected) / (now - self.lastDetect)
+        else:
+            self.velocity = None
+
+        self.detected = landmarks
+        self.landmarks = landmarks
+        self.lastDetect = now
+        self.framesSinceDetect = 0
+        self.predicted = False
+
+        if self.roiTracking:
+            self.roi = self._nextRoi(w, h)
+
+    def _predict(self, img, now):
+        """Extrapolate all landmarks of all hands from the last detection in one array op."""
+        self.framesSinceDetect += 1
+        if self.detected is None or self.velocity is None:
+            self.landmarks = self.detected
+        else:
+            self.landmarks = self.detected + self.velocity * (now - self.lastDetect)
+        self.predicted = self.landmarks is not None
+
+        # Keep the crop centred on where the hand is expected to be
+        if self.roiTracking:
+            h, w = img.shape[:2]
+            self.roi = self._nextRoi(w, h)
+
+    def _inferenceImage(self, img, name):
+        """RGB copy of img for MediaPipe, downscaled by inferenceScale.
+
+        Written into arena buffers kept apart per ``name``, so full-frame and
+        ROI searches each reuse their own buffer size.
+        """
+        if self.inferenceScale < 1.0:
+            h, w = img.shape[:2]
+            size = (max(1, int(w * self.inferenceScale)), max(1, int(h * self.inferenceScale)))
+            img = cv2.resize(img, size, dst=self.arena.take(name + '_small', (size[1], size[0], 3)),
+                             interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self.arena.like(name, img))
+
+    def _processRoi(self, img, w, h):
+        """Run inference on the ROI crop and remap landmarks to full-frame coordinates.
+
+        Returns None when no hand is found in the crop, so the caller can fall
+        back to a full-frame search on the same frame.
+        """
+        x0, y0, x1, y1 = self.roi
+        results = self.hands.process(self._inferenceImage(img[y0:y1, x0:x1], 'roi'))
+        if not results.multi_hand_landmarks:
+            return None
+
+        cw, ch = x1 - x0, y1 - y0
+        for handLms in results.multi_hand_landmarks:
+            for lm in handLms.landmark:
+                lm.x = (x0 + lm.x * cw) / w
+                lm.y = (y0 + lm.y * ch) / h
+        return results
+
+    def _nextRoi(self, w, h):
+        """Padded square box around all detected hands, or None to search the full frame."""
+        if self.landmarks is None:
+            return None
+
+        xs, ys = self.landmarks[:, :, 0], self.landmarks[:, :, 1]
+        left, right = float(xs.min()) * w, float(xs.max()) * w
+        top, bottom = float(ys.min()) * h, float(ys.max()) * h
+
+        size = max(right - left, bottom - top)
+        size = max(size * (1 + 2 * self.roiPadding), self.roiMinSize)
+        # Keep the crop size while the hand still fits with at least 3/4 of it in
+        # use; otherwise round up to the next step (one arena buffer per size)
+        if self.roiSize is None or not 0.75 * self.roiSize <= size <= self.roiSize:
+            self.roiSize = -(-int(size) // self.roiStep) * self.roiStep
+        size = int(min(self.roiSize, w, h))
+        cx, cy = (left + right) / 2, (top + bottom) / 2
+        x0 = int(min(max(cx - size / 2, 0), w - size))
+        y0 = int(min(max(cy - size / 2, 0), h - size))
+        return (x0, y0, x0 + size, y0 + size)
+
+    def resetTracking(self):
+        """Forget the ROI and motion state so the next frame runs a full-frame detection."""
+        self.roi = None
+        self.roiSize = None
+        self.roiFrames = 0
+        self.lastDetect = None
+        self.velocity = None
+        self.detected = None
+        self.landmarks = None
+        self.predicted = False
+        self.framesSinceDetect = 0
+
+    def findLandmarks(self, img, draw=False):
+        """Pixel landmarks of every hand as an (n_hands, 21, 3) int32 array of [id, cx, cy].
+
+        Rows have the same layout as findPosition's lists, so ``arr[0][8][1:]``
+        is the index fingertip of the first hand.
+        """
+        if self.landmarks is None:
+            self.lmArray = np.zeros((0, 21, 3), dtype=np.int32)
+            return self.lmArray
+
+        h, w = img.shape[:2]
+        self.lmArray = to_pixels(self.landmarks, w, h)
+        if draw:
+            for cx, cy in self.lmArray[:, :, 1:].reshape(-1, 2):
+                cv2.circle(img, (int(cx), int(cy)), 10, (255, 0, 255), cv2.FILLED)
+        return self.lmArray
+
     def findPosition(self, img, handNo=0, draw=True):
+        # List API kept for compatibility; built from findLandmarks
+        lmArray = self.findLandmarks(img)
         self.lmList = []
-        if self.results.multi_hand_landmarks:
-            myHand = self.results.multi_hand_landmarks[handNo]
-            for id, lm in enumerate(myHand.landmark):
-                h, w, c = img.shape
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                self.lmList.append([id, cx, cy])
-                if draw:
+        if handNo < len(lmArray):
+            self.lmList = lmArray[handNo].tolist()
+            if draw:
+                for id, cx, cy in self.lmList:
                     cv2.circle(img, (cx, cy), 10, (255, 0, 255), cv2.FILLED)
         return self.lmList
 
+    def fingersUpAll(self, lmArray=None):
+        """Finger states of every hand as an (n_hands, 5) uint8 array (thumb first)."""
+        return fingers_up(self.lmArray if lmArray is None else lmArray)
+
     def fingersUp(self):
-        fingers = []
+        # List API kept for compatibility, for the hand from the last findPosition call
+        return fingers_up(np.asarray(self.lmList)[None])[0].tolist()
 
-        # Thumb
-        if self.lmList[self.tipIds[0]][1] > self.lmList[self.tipIds[0] - 1][1]:
-            fingers.append(1)
-        else:
-            fingers.append(0)
 
-        # 4 Fingers
-        for id in range(1, 5):
-            if self.lmList[self.tipIds[id]][2] < self.lmList[self.tipIds[id] - 2][2]:  # Compare y-coordinates
-                fingers.append(1)
-            else:
-                fingers.append(0)
+LANDMARK_IDS = np.arange(21, dtype=np.int32)
+TIP_IDS = np.array([4, 8, 12, 16, 20])
+
+
+def to_pixels(landmarks, w, h):
+    """Normalized (n_hands, 21, 3) landmarks to an int32 array of [id, cx, cy] rows."""
+    lmArray = np.empty((len(landmarks), 21, 3), dtype=np.int32)
+    lmArray[:, :, 0] = LANDMARK_IDS
+    # Truncate like int() so results match the list API
+    lmArray[:, :, 1:] = landmarks[:, :, :2] * np.array([w, h], dtype=np.float32)
+    return lmArray
+
 
-        return fingers
+def fingers_up(lmArray):
+    """Vectorized fingersUp for an (n_hands, 21, 3) array of [id, cx, cy] landmarks."""
+    lmArray = np.asarray(lmArray)
+    fingers = np.empty((len(lmArray), 5), dtype=np.uint8)
+    # Thumb: tip is right of the joint below it
+    fingers[:, 0] = lmArray[:, TIP_IDS[0], 1] > lmArray[:, TIP_IDS[0] - 1, 1]
+    # 4 Fingers: tip is above the middle joint (compare y-coordinates)
+    fingers[:, 1:] = lmArray[:, TIP_IDS[1:], 2] < lmArray[:, TIP_IDS[1:] - 2, 2]
+    return fingers
 
 
-def main():
+def main(source=None):
     st.set_page_config(page_title="Hand Tracking App", page_icon="✋", layout="wide")
     
     # Sidebar configuration
@@ -75,6 +264,8 @@ def main():
     detection_confidence = st.sidebar.slider("Detection Confidence", 0.0, 1.0, 0.5, 0.1)
     tracking_confidence = st.sidebar.slider("Tracking Confidence", 0.0, 1.0, 0.5, 0.1)
     max_hands = st.sidebar.selectbox("Maximum Hands", [1, 2], index=1)
+    roi_tracking = st.sidebar.checkbox("ROI Tracking", value=False)
+    inference_scale = st.sidebar.select_slider("Inference Scale", [0.25, 0.35, 0.5, 0.75, 1.0], value=1.0)
     
     # Main content
     st.title("✋ Hand Tracking Application")
@@ -108,18 +299,23 @@ def main():
     if 'tracking' not in st.session_state:
         st.session_state.tracking = False
 
-    # Initialize the detector with user settings
-    detector = handDetector(
+    # Detector with user settings, from the warm pool so slider changes only
+    # rebuild MediaPipe the first time a combination is used
+    from DetectorPool import session_detector
+    detector = session_detector(
         mode=False,
         maxHands=max_hands,
         detectionCon=detection_confidence,
-        trackCon=tracking_confidence
+        trackCon=tracking_confidence,
+        roiTracking=roi_tracking,
+        inferenceScale=inference_scale
     )
 
-    # Initialize webcam
-    cap = cv2.VideoCapture(0)
+    # Initialize webcam, or the frame source passed in (see FrameSources)
+    cap = source if source is not None else cv2.VideoCapture(0)
     
     pTime = 0
+    arena = FrameArena()
     
     while cap.isOpened():
         if start_button:
@@ -154,7 +350,7 @@ def main():
         cv2.putText(img, f"FPS: {int(fps)}", (10, 70), cv2.FONT_HERSHEY_PLAIN, 3, (255, 0, 255), 3)
         
         # Convert the image to RGB for Streamlit
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=arena.like('rgb', img))
         
         # Display the image in Streamlit
         frame_placeholder.image(img_rgb, channels="RGB", use_column_width=True)
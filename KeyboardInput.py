@@ -2,16 +2,84 @@
 import time
 import cv2
 import numpy as np
-from collections import deque
+from collections import deque, namedtuple
+from functools import lru_cache
+from TextIndex import TextIndex
+
+
+class TextObject(namedtuple('TextObject', 'text position color font scale thickness')):
+    """A placed piece of text. Immutable: edits make a new record with ``_replace``,
+    so snapshots of the text layer can share records safely."""
+    __slots__ = ()
+
+
+# A pre-rendered piece of text: BGR pixels drawn over black, a mask of the pixels
+# to copy, the inverted coverage (3 channels) when the glyphs are antialiased
+# (None when every pixel is fully on or off), the offset from the text origin
+# (baseline-left, as in putText) to the sprite's top-left corner, and the
+# getTextSize box
+TextSprite = namedtuple('TextSprite', 'bgr mask inv_alpha offset text_size')
+
+
+def render_text_sprite(text, font, scale, color, thickness, outline_color, outline_thickness):
+    """Rasterize ``text`` with its outline into a TextSprite."""
+    (w, h), baseline = cv2.getTextSize(text, font, scale, max(thickness, outline_thickness))
+    pad = max(thickness, outline_thickness) + 2
+    origin = (pad, pad + h)
+    size = (h + baseline + 2 * pad, w + 2 * pad)
+
+    bgr = np.zeros(size + (3,), np.uint8)
+    alpha = np.zeros(size, np.uint8)
+    cv2.putText(bgr, text, origin, font, scale, outline_color, outline_thickness)
+    cv2.putText(alpha, text, origin, font, scale, 255, outline_thickness)
+    cv2.putText(bgr, text, origin, font, scale, color, thickness)
+    cv2.putText(alpha, text, origin, font, scale, 255, thickness)
+
+    inv_alpha = None
+    if np.any((alpha > 0) & (alpha < 255)):
+        inv_alpha = cv2.cvtColor(255 - alpha, cv2.COLOR_GRAY2BGR)
+        inv_alpha.setflags(write=False)
+    mask = (alpha > 0).view(np.uint8)
+    bgr.setflags(write=False)
+    mask.setflags(write=False)
+    return TextSprite(bgr, mask, inv_alpha, (-pad, -pad - h), cv2.getTextSize(text, font, scale, thickness)[0])
+
+
+# Cached by content and style, for hints and the text being typed; the labels on
+# the text layer keep their sprites in KeyboardInput.sprites instead, so any
+# number of labels can be drawn every frame without evicting each other
+text_sprite = lru_cache(maxsize=512)(render_text_sprite)
+
+
+def blit_sprite(img, sprite, position):
+    """Copy a sprite onto ``img`` with its text origin at ``position``, clipped to the image."""
+    x, y = position[0] + sprite.offset[0], position[1] + sprite.offset[1]
+    h, w = sprite.mask.shape
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, img.shape[1]), min(y + h, img.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return
+    rows, cols = slice(y0 - y, y1 - y), slice(x0 - x, x1 - x)
+    roi = img[y0:y1, x0:x1]
+    if sprite.inv_alpha is None:
+        cv2.copyTo(sprite.bgr[rows, cols], sprite.mask[rows, cols], roi)
+    else:
+        # Antialiased edges: roi * (1 - alpha) + premultiplied sprite
+        background = cv2.multiply(roi, sprite.inv_alpha[rows, cols], scale=1 / 255)
+        cv2.add(background, sprite.bgr[rows, cols], dst=roi)
+
 
 class KeyboardInput:
-    def __init__(self):
+    def __init__(self, max_objects=None, history_length=50):
         self.text = ""
         self.active = False
         self.cursor_visible = True
         self.cursor_timer = 0
         self.cursor_blink_interval = 0.5  # seconds
-        self.text_objects = deque(maxlen=20)  # Stores all text objects
+        self.max_objects = max_objects  # None for no limit
+        self.text_objects = ()  # Stores all text objects (tuple of TextObject, replaced on every change)
+        self.index = TextIndex()  # Bounding boxes of text_objects for hit-tests
+        self.sprites = {}  # (text, font, scale, color, thickness) -> TextSprite of a label
         self.dragging = False
         self.drag_object_index = -1
         self.drag_offset = (0, 0)
@@ -25,10 +93,21 @@ class KeyboardInput:
         self.input_dragging = False
         self.input_drag_offset = (0, 0)
         self.selected_object_index = -1  # Track selected text object
-        self.text_history = []  # To store text object states for undo/redo
+        self.text_history = deque(maxlen=history_length)  # Text layer states for undo/redo
         self.history_index = -1
 
 
+    def sprite(self, obj):
+        key = (obj.text, obj.font, obj.scale, obj.color, obj.thickness)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            if len(self.sprites) >= 2 * len(self.text_objects) + 64:
+                # Drop the sprites of labels no longer on the layer (amortized O(1))
+                live = {(o.text, o.font, o.scale, o.color, o.thickness) for o in self.text_objects}
+                self.sprites = {k: v for k, v in self.sprites.items() if k in live}
+            sprite = self.sprites[key] = render_text_sprite(*key, self.outline_color, self.outline_thickness)
+        return sprite
+
     def toggle_keyboard_mode(self):
         self.active = not self.active
         if self.active:
@@ -64,41 +143,67 @@ class KeyboardInput:
 
         self.save_state()
 
-        self.text_objects.append({
-            'text': self.text,
-            'position': self.current_input_position,
-            'color': self.default_color,
-            'font': self.default_font,
-            'scale': self.default_scale,
-            'thickness': self.default_thickness,
-            'selected': False
-        })
-
+        obj = TextObject(self.text, self.current_input_position, self.default_color,
+                         self.default_font, self.default_scale, self.default_thickness)
+        # Oldest objects drop off once max_objects is reached
+        if self.max_objects is not None and len(self.text_objects) >= self.max_objects:
+            self.remove_text_object(0)
+        self.sync_index()
+        self.text_objects = self.text_objects + (obj,)
+        self.index.append(self.text_objects, self.text_box(obj))
+
+    def set_text_objects(self, text_objects):
+        """Replace the text layer (e.g. with a snapshot). Clears the selection."""
+        self.text_objects = tuple(text_objects)
+        self.selected_object_index = -1
+        self.drag_object_index = -1
 
+    def text_box(self, obj):
+        # (left, top, right, bottom) of the text, as used by every hit-test
+        w, h = self.sprite(obj).text_size
+        x, y = obj.position
+        return x, y - h, x + w, y
+
+    def sync_index(self):
+        self.index.sync(self.text_objects, self.text_box)
+
+    def hit_test(self, x, y):
+        """Index of the topmost text object under (x, y), or -1."""
+        self.sync_index()
+        return self.index.hit(int(x), int(y))
+
+    def remove_text_object(self, idx):
+        self.sync_index()
+        self.text_objects = self.text_objects[:idx] + self.text_objects[idx + 1:]
+        self.index.remove(self.text_objects, idx)
+        if self.selected_object_index == idx:
+            self.selected_object_index = -1
+        elif self.selected_object_index > idx:
+            self.selected_object_index -= 1
 
     def delete_selected(self):
         """Delete the currently selected text object"""
         if self.drag_object_index >= 0:
             # Remove the selected object
             if 0 <= self.drag_object_index < len(self.text_objects):
-                del self.text_objects[self.drag_object_index]
+                self.remove_text_object(self.drag_object_index)
             self.drag_object_index = -1
 
     def save_state(self):
-        """Save current text objects state for undo/redo"""
+        """Save current text objects state for undo/redo (O(1): the tuple is shared)"""
         # Truncate history if we're not at the end
-        if self.history_index < len(self.text_history) - 1:
-            self.text_history = self.text_history[:self.history_index + 1]
+        while self.history_index < len(self.text_history) - 1:
+            self.text_history.pop()
 
-        # Save current state
-        self.text_history.append(list(self.text_objects))
+        # Save current state; the oldest state drops off when the history is full
+        self.text_history.append(self.text_objects)
         self.history_index = len(self.text_history) - 1
 
     def undo(self):
         """Undo the last text operation"""
         if self.history_index > 0:
             self.history_index -= 1
-            self.text_objects = deque(list(self.text_history[self.history_index]), maxlen=20)
+            self.set_text_objects(self.text_history[self.history_index])
             return True
         return False
 
@@ -106,7 +211,7 @@ class KeyboardInput:
         """Redo the last undone text operation"""
         if self.history_index < len(self.text_history) - 1:
             self.history_index += 1
-            self.text_objects = deque(list(self.text_history[self.history_index]), maxlen=20)
+            self.set_text_objects(self.text_history[self.history_index])
             return True
         return False
 
@@ -121,79 +226,33 @@ class KeyboardInput:
             self.cursor_visible = not self.cursor_visible
 
     def draw(self, img):
-        # Draw all existing text objects (always draw these)
+        # Draw all existing text objects (always draw these) from their cached sprites
         for i, obj in enumerate(self.text_objects):
-            # Draw outline
-            cv2.putText(
-                img,
-                obj['text'],
-                obj['position'],
-                obj['font'],
-                obj['scale'],
-                self.outline_color,
-                self.outline_thickness
-            )
-            # Draw main text
-            cv2.putText(
-                img,
-                obj['text'],
-                obj['position'],
-                obj['font'],
-                obj['scale'],
-                obj['color'],
-                obj['thickness']
-            )
+            sprite = self.sprite(obj)
+            blit_sprite(img, sprite, obj.position)
 
             # Draw selection rectangle if selected
-            if obj['selected']:
-                text_size = cv2.getTextSize(
-                    obj['text'],
-                    obj['font'],
-                    obj['scale'],
-                    obj['thickness']
-                )[0]
+            if i == self.selected_object_index:
+                text_size = sprite.text_size
                 top_left = (
-                    obj['position'][0] - 5,
-                    obj['position'][1] - text_size[1] - 5
+                    obj.position[0] - 5,
+                    obj.position[1] - text_size[1] - 5
                 )
                 bottom_right = (
-                    obj['position'][0] + text_size[0] + 5,
-                    obj['position'][1] + 5
+                    obj.position[0] + text_size[0] + 5,
+                    obj.position[1] + 5
                 )
                 cv2.rectangle(img, top_left, bottom_right, (0, 255, 0), 2)
 
         # Only draw current input text and cursor if keyboard is active
         if self.active:
-            # Draw outline
-            cv2.putText(
-                img,
-                self.text,
-                self.current_input_position,
-                self.default_font,
-                self.default_scale,
-                self.outline_color,
-                self.outline_thickness
-            )
-
-            # Draw main text
-            cv2.putText(
-                img,
-                self.text,
-                self.current_input_position,
-                self.default_font,
-                self.default_scale,
-                self.default_color,
-                self.default_thickness
-            )
+            sprite = text_sprite(self.text, self.default_font, self.default_scale, self.default_color,
+                                 self.default_thickness, self.outline_color, self.outline_thickness)
+            blit_sprite(img, sprite, self.current_input_position)
 
             # Draw cursor if visible
             if self.cursor_visible:
-                text_size = cv2.getTextSize(
-                    self.text,
-                    self.default_font,
-                    self.default_scale,
-                    self.default_thickness
-                )[0]
+                text_size = sprite.text_size
                 cursor_pos = (
                     self.current_input_position[0] + text_size[0],
                     self.current_input_position[1]
@@ -208,40 +267,20 @@ class KeyboardInput:
 
     def check_drag_start(self, x, y):
         # First check if we're selecting existing text objects
-        for i, obj in enumerate(reversed(self.text_objects)):
-            idx = len(self.text_objects) - 1 - i  # Get original index
-            text_size = cv2.getTextSize(
-                obj['text'],
-                obj['font'],
-                obj['scale'],
-                obj['thickness']
-            )[0]
-
-            text_left = obj['position'][0]
-            text_right = obj['position'][0] + text_size[0]
-            text_top = obj['position'][1] - text_size[1]
-            text_bottom = obj['position'][1]
-
-            if (text_left <= x <= text_right and
-                    text_top <= y <= text_bottom):
-                # Deselect all other objects
-                for obj in self.text_objects:
-                    obj['selected'] = False
-                # Select this object
-                self.text_objects[idx]['selected'] = True
-                self.drag_object_index = idx
-                self.drag_offset = (x - obj['position'][0], y - obj['position'][1])
-                self.dragging = True
-                return True
+        idx = self.hit_test(x, y)
+        if idx >= 0:
+            obj = self.text_objects[idx]
+            # Select this object (only one is selected at a time)
+            self.selected_object_index = idx
+            self.drag_object_index = idx
+            self.drag_offset = (x - obj.position[0], y - obj.position[1])
+            self.dragging = True
+            return True
 
         # Then check if we're dragging current input text (only if keyboard active)
         if self.active and (self.text or self.cursor_visible):
-            text_size = cv2.getTextSize(
-                self.text,
-                self.default_font,
-                self.default_scale,
-                self.default_thickness
-            )[0]
+            text_size = text_sprite(self.text, self.default_font, self.default_scale, self.default_color,
+                                    self.default_thickness, self.outline_color, self.outline_thickness).text_size
 
             text_left = self.current_input_position[0]
             text_right = self.current_input_position[0] + text_size[0]
@@ -258,8 +297,7 @@ class KeyboardInput:
                 return True
 
         # If clicking elsewhere, deselect all
-        for obj in self.text_objects:
-            obj['selected'] = False
+        self.selected_object_index = -1
         self.drag_object_index = -1
         return False
 
@@ -271,10 +309,13 @@ class KeyboardInput:
                 y - self.input_drag_offset[1]
             )
         elif self.dragging and self.drag_object_index >= 0:
-            # Update position of dragged text object
-            obj = self.text_objects[self.drag_object_index]
+            # Update position of dragged text object (a new record; snapshots keep the old one)
+            idx = self.drag_object_index
             new_pos = (x - self.drag_offset[0], y - self.drag_offset[1])
-            self.text_objects[self.drag_object_index]['position'] = new_pos
+            obj = self.text_objects[idx]._replace(position=new_pos)
+            self.sync_index()
+            self.text_objects = self.text_objects[:idx] + (obj,) + self.text_objects[idx + 1:]
+            self.index.move(self.text_objects, idx, self.text_box(obj))
 
     def end_drag(self):
         self.input_dragging = False
@@ -283,6 +324,5 @@ class KeyboardInput:
 
     def clear_selection(self):
         """Clear all text selections"""
-        for obj in self.text_objects:
-            obj['selected'] = False
+        self.selected_object_index = -1
         self.drag_object_index = -1
\ No newline at end of file
@@ -0,0 +1,195 @@
+# MultiStreamDetector.py
+import multiprocessing
+import queue
+import threading
+import time
+import cv2
+import numpy as np
+
+
+def _detector_worker(worker_id, inbox, outbox, detector_kwargs):
+    # Imported here so only worker processes pay for loading MediaPipe
+    import HandTrackingModule as htm
+
+    # One detector per stream: MediaPipe's tracking state must not mix cameras
+    detectors = {}
+    while True:
+        job = inbox.get()
+        if job is None:
+            break
+
+        stream_id, frame_id, img, size, submitted = job
+        detector = detectors.get(stream_id)
+        if detector is None:
+            detector = detectors[stream_id] = htm.handDetector(**detector_kwargs)
+
+        start = time.perf_counter()
+        detector.findHands(img, draw=False)
+        inference_time = time.perf_counter() - start
+
+        if detector.landmarks is None:
+            lmArray = np.zeros((0, 21, 3), dtype=np.int32)
+        else:
+            lmArray = htm.to_pixels(detector.landmarks, *size)
+        outbox.put({
+            'stream': stream_id,
+            'frame_id': frame_id,
+            'landmarks': lmArray,
+            'fingers': htm.fingers_up(lmArray),
+            'worker': worker_id,
+            'submitted': submitted,
+            'inference_time': inference_time,
+        })
+
+
+class MultiStreamDetector:
+    """Hand detection for several cameras on a pool of worker processes.
+
+    Each worker process owns the handDetector instances of the streams
+    assigned to it, so detection runs outside the GIL and throughput scales
+    with CPU cores. A stream always goes to the same worker, keeping its
+    frames in order and its tracking state in one place. Results come back
+    tagged with the stream id and frame id, with pixel landmarks in the
+    coordinates of the submitted frame.
+    """
+
+    def __init__(self, workers=None, queue_size=2, transfer_scale=1.0, **detector_kwargs):
+        self.workers = workers or max(1, multiprocessing.cpu_count() - 1)
+        self.queue_size = queue_size  # Frames waiting per worker before new ones are dropped
+        self.transfer_scale = transfer_scale  # Downscale frames before sending them to a worker
+        self.detector_kwargs = detector_kwargs
+        self.context = multiprocessing.get_context('spawn')  # MediaPipe is not fork-safe
+        self.inboxes = []
+        self.outbox = None
+        self.processes = []
+        self.assignments = {}  # stream id -> worker index
+        self.frame_ids = {}
+        self.dropped = {}
+        self.latest = {}
+        self.latest_lock = threading.Lock()
+        self.callbacks = []
+        self.collector = None
+        self.running = False
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self.outbox = self.context.Queue()
+        for worker_id in range(self.workers):
+            inbox = self.context.Queue(maxsize=self.queue_size)
+            process = self.context.Process(target=_detector_worker,
+                                           args=(worker_id, inbox, self.outbox, self.detector_kwargs),
+                                           name=f"HandDetector-{worker_id}", daemon=True)
+            process.start()
+            self.inboxes.append(inbox)
+            self.processes.append(process)
+
+        self.collector = threading.Thread(target=self._collect, name="MultiStreamCollector", daemon=True)
+        self.collector.start()
+        return self
+
+    def add_stream(self, stream_id):
+        """Pin a stream to the worker with the fewest streams."""
+        if stream_id not in self.assignments:
+            load = [list(self.assignments.values()).count(i) for i in range(self.workers)]
+            self.assignments[stream_id] = load.index(min(load))
+            self.frame_ids[stream_id] = 0
+            self.dropped[stream_id] = 0
+        return self.assignments[stream_id]
+
+    def submit(self, stream_id, img):
+        """Queue a frame for detection. Returns False if the stream's worker is busy and it was dropped."""
+        worker = self.add_stream(stream_id)
+        self.frame_ids[stream_id] += 1
+        h, w = img.shape[:2]
+        if self.transfer_scale < 1.0:
+            img = cv2.resize(img, (int(w * self.transfer_scale), int(h * self.transfer_scale)),
+                             interpolation=cv2.INTER_AREA)
+        try:
+            self.inboxes[worker].put_nowait((stream_id, self.frame_ids[stream_id], img, (w, h), time.time()))
+            return True
+        except queue.Full:
+            self.dropped[stream_id] += 1
+            return False
+
+    def on_result(self, callback):
+        """Call ``callback(result)`` on the collector thread for every result."""
+        self.callbacks.append(callback)
+
+    def _collect(self):
+        while self.running:
+            try:
+                result = self.outbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            result['latency'] = time.time() - result['submitted']
+            with self.latest_lock:
+                self.latest[result['stream']] = result
+            for callback in self.callbacks:
+                callback(result)
+
+    def get_latest(self, stream_id):
+        """Most recent result for a stream, or None if none has arrived yet."""
+        with self.latest_lock:
+            return self.latest.get(stream_id)
+
+    def stop(self):
+        if not self.running:
+            return
+        for inbox in self.inboxes:
+            try:
+                inbox.put(None, timeout=1.0)
+            except queue.Full:
+                pass
+        for process in self.processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        self.running = False
+        if self.collector is not None:
+            self.collector.join(timeout=1.0)
+        self.inboxes = []
+        self.processes = []
+
+
+def main():
+    """Run several sources through the pool and print per-stream throughput."""
+    import argparse
+    from FrameSources import make_source
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('sources', nargs='+', help='Camera indexes, video paths or "synthetic"')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--transfer-scale', type=float, default=1.0)
+    args = parser.parse_args()
+
+    sources = {f"stream{i}": make_source(spec) for i, spec in enumerate(args.sources)}
+    service = MultiStreamDetector(workers=args.workers, transfer_scale=args.transfer_scale,
+                                  detectionCon=0.85).start()
+    counts = {stream_id: 0 for stream_id in sources}
+
+    def count(result):
+        counts[result['stream']] += 1
+
+    service.on_result(count)
+    try:
+        end = time.time() + args.seconds
+        while time.time() < end:
+            for stream_id, source in sources.items():
+                success, img = source.read()
+                if success:
+                    service.submit(stream_id, cv2.flip(img, 1))
+    finally:
+        service.stop()
+        for source in sources.values():
+            source.release()
+
+    for stream_id in sources:
+        print(f"{stream_id}: {counts[stream_id] / args.seconds:.1f} detections/s, "
+              f"{service.dropped[stream_id]} frames dropped")
+
+
+if __name__ == "__main__":
+    main()
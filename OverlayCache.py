@@ -0,0 +1,46 @@
+# OverlayCache.py
+import cv2
+import numpy as np
+
+
+class OverlayCache:
+    """Static overlay layers, prepared once and applied in place.
+
+    Each translucent layer ``dst = a * frame + layer`` is stored with its
+    opacity already multiplied in (uint8 fixed point), so applying it is a
+    single ``cv2.scaleAdd`` into the frame region. Guides are premultiplied
+    the first time each one is shown and kept until the guide list changes.
+    """
+
+    def __init__(self, guide_alpha=0.3, frame_alpha=0.3, tint=(50, 50, 50), tint_alpha=0.3,
+                 typing_rows=(620, 720), guide_rows=(125, 720), width=1280):
+        self.guide_alpha = guide_alpha  # Weight of the guide image
+        self.frame_alpha = frame_alpha  # Weight of the frame under the guide
+        self.typing_rows = typing_rows
+        self.guide_rows = guide_rows
+
+        # Typing-area tint: frame * (1 - a) + tint * a
+        self.tint_keep = 1 - tint_alpha
+        h = typing_rows[1] - typing_rows[0]
+        self.tint = np.empty((h, width, 3), np.uint8)
+        self.tint[:] = np.rint(np.array(tint) * tint_alpha).astype(np.uint8)
+
+        self.guides = {}  # id(guide image) -> premultiplied guide
+        self.guide_source = None
+
+    def apply_typing_area(self, img):
+        y0, y1 = self.typing_rows
+        roi = img[y0:y1]
+        cv2.scaleAdd(roi, self.tint_keep, self.tint, dst=roi)
+
+    def apply_guide(self, img, guide, guideList=None):
+        if guideList is not None and guideList is not self.guide_source:
+            # New set of guides: drop the cached layers
+            self.guides.clear()
+            self.guide_source = guideList
+        layer = self.guides.get(id(guide))
+        if layer is None:
+            layer = self.guides[id(guide)] = cv2.convertScaleAbs(guide, alpha=self.guide_alpha)
+        y0, y1 = self.guide_rows
+        roi = img[y0:y1]
+        cv2.scaleAdd(roi, self.frame_alpha, layer, dst=roi)
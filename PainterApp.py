@@ -0,0 +1,260 @@
+# PainterApp.py
+import streamlit as st
+import cv2
+import os
+import time
+from DetectorPool import PAINTER_DETECTOR, session_detector
+from PainterEngine import PainterEngine
+from FrameArena import FrameArena
+from FrameGrabber import FrameGrabber
+from FrameSources import make_source
+from FrameStreamer import session_channel
+from PainterPipeline import PainterPipeline, Stage
+import keyboard
+
+# Page text for each portal; everything else is shared
+ROLES = {
+    'student': {'title': "Beyond The Brush", 'run_label': 'Click this to Stop the webcam '},
+    'educator': {'title': "Beyond The Brush - Virtual Painter", 'run_label': 'Run'},
+}
+
+
+def handle_keyboard_events(keyboard_input):
+    if keyboard_input.active:
+        if keyboard.is_pressed('enter'):
+            keyboard_input.process_key_input(13)  # Enter key
+        elif keyboard.is_pressed('backspace'):
+            keyboard_input.process_key_input(8)  # Backspace
+        elif keyboard.is_pressed('esc'):
+            keyboard_input.active = False
+        elif keyboard.is_pressed('caps lock'):
+            # Toggle caps lock state
+            keyboard_input.caps_lock = not getattr(keyboard_input, 'caps_lock', False)
+        else:
+            shift_pressed = keyboard.is_pressed('shift')
+            caps_lock_active = getattr(keyboard_input, 'caps_lock', False)
+
+            # First check numbers (they shouldn't be affected by caps lock)
+            for num in '0123456789':
+                if keyboard.is_pressed(num):
+                    if shift_pressed:
+                        # Shift + number gives the special character
+                        shift_num_map = {
+                            '1': '!', '2': '@', '3': '#', '4': '$', '5': '%',
+                            '6': '^', '7': '&', '8': '*', '9': '(', '0': ')'
+                        }
+                        char = shift_num_map[num]
+                        keyboard_input.process_key_input(ord(char))
+                    else:
+                        # Regular number
+                        keyboard_input.process_key_input(ord(num))
+                    return
+
+            # Then check letters (affected by both shift and caps lock)
+            for letter in 'abcdefghijklmnopqrstuvwxyz':
+                if keyboard.is_pressed(letter):
+                    if shift_pressed ^ caps_lock_active:  # XOR - uppercase if either is true
+                        keyboard_input.process_key_input(ord(letter.upper()))
+                    else:
+                        keyboard_input.process_key_input(ord(letter.lower()))
+                    return
+
+            # Then check other special characters (space, punctuation, etc.)
+            special_chars = {
+                'space': ' ',
+                'tab': '\t',
+                '-': '-', '=': '=',
+                '[': '[', ']': ']', '\\': '\\',
+                ';': ';', "'": "'",
+                ',': ',', '.': '.', '/': '/',
+                '`': '`'
+            }
+
+            # Shifted versions of special characters
+            shifted_special_chars = {
+                '-': '_', '=': '+',
+                '[': '{', ']': '}', '\\': '|',
+                ';': ':', "'": '"',
+                ',': '<', '.': '>', '/': '?',
+                '`': '~'
+            }
+
+            for char in special_chars:
+                if keyboard.is_pressed(char):
+                    if shift_pressed and char in shifted_special_chars:
+                        keyboard_input.process_key_input(ord(shifted_special_chars[char]))
+                    else:
+                        keyboard_input.process_key_input(ord(special_chars[char]))
+                    return
+
+
+def run_painter(role='student', source=None):
+    # source: any frame source from FrameSources (camera, video file or synthetic).
+    # Defaults to the PAINTER_SOURCE environment variable, else the webcam.
+    page = ROLES[role]
+
+    # Add loading screen CSS
+    st.markdown(
+        """
+        <style>
+        /* Progress bar */
+        .stProgress > div > div > div > div {
+            background: linear-gradient(90deg, #6a11cb 0%, #2575fc 100%);
+            height: 10px;
+            border-radius: 5px;
+        }
+        </style>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    # Variables
+    fps = 50
+    time_per_frame = 5.0 / fps
+
+    # Canvas, tools, guides and undo history live in the headless engine.
+    # Saves are written in PAINTER_EXPORT_FORMAT (png, jpg or webp), default png.
+    engine = PainterEngine(export_format=os.environ.get('PAINTER_EXPORT_FORMAT', 'png'))
+
+    # Streamlit app
+    st.title(page['title'])
+
+    # Camera input
+    run = st.checkbox(page['run_label'], value=True)
+
+    # Frames reach the browser over the local MJPEG stream (see FrameStreamer),
+    # not through Streamlit reruns; PAINTER_STREAM=0 falls back to st.image
+    channel = None
+    if os.environ.get('PAINTER_STREAM', '1') != '0':
+        try:
+            channel, stream_url = session_channel()
+        except OSError as e:
+            st.warning(f'Frame stream unavailable ({e}), showing frames through Streamlit instead.')
+    if channel is not None:
+        st.markdown(f'<img src="{stream_url}" style="width: 100%;">', unsafe_allow_html=True)
+    else:
+        FRAME_WINDOW = st.image([])
+    status = st.empty()  # Per-stage pipeline timings
+
+    # Add camera loading state
+    if 'camera_initialized' not in st.session_state:
+        st.session_state.camera_initialized = False
+
+    # Show loading spinner while initializing camera
+    if not st.session_state.camera_initialized:
+        with st.spinner('Initializing camera...'):
+            try:
+                if 'cap' not in st.session_state:
+                    if source is None:
+                        source = make_source(os.environ.get('PAINTER_SOURCE'))
+                    st.session_state.cap = source
+                    if not st.session_state.cap.isOpened():
+                        st.error('Failed to initialize camera. Please check your camera connection.')
+                        st.stop()
+                    st.session_state.camera_initialized = True
+            except Exception as e:
+                st.error(f'Error initializing camera: {str(e)}')
+                st.stop()
+            time.sleep(1)  # Brief pause to show loading state
+
+    cap = st.session_state.cap
+
+    # Read the camera on a background thread so the loop always gets the newest frame
+    if 'grabber' not in st.session_state:
+        st.session_state.grabber = FrameGrabber(cap).start()
+    grabber = st.session_state.grabber
+
+    # Assigning Detector (warm, and kept across reruns of this session)
+    detector = session_detector(**PAINTER_DETECTOR)
+
+    # Flipped and RGB frames are written into reused buffers, one per frame in flight
+    arena = FrameArena()
+
+    def capture(_):
+        # 1. Import Image (newest frame from the grabber)
+        success, img = grabber.read()
+        if not success:
+            return None
+        return {'img': cv2.flip(img, 1, dst=arena.like('flip', img))}
+
+    def infer(item):
+        # 2. Find Hand Landmarks
+        img = detector.findHands(item['img'], draw=False)
+        lmArray = detector.findLandmarks(img)
+        # 3. Check which fingers are up, for all hands at once
+        fingers = detector.fingersUpAll(lmArray)
+        # The painter follows the first hand
+        if len(lmArray) == 0:
+            return {'img': img, 'lmList': [], 'fingers': []}
+        return {'img': img, 'lmList': lmArray[0], 'fingers': fingers[0]}
+
+    def composite(item):
+        # Handle keyboard input, then run the gesture logic and compositing
+        engine.run_keyboard_events(handle_keyboard_events)
+        img = engine.process(item['img'], item['lmList'], item['fingers'])
+        if channel is not None:
+            # Encoded here on the worker; the browser pulls it from the stream
+            channel.publish(img)
+            item['img'] = None
+        else:
+            item['img'] = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=arena.like('rgb', img))
+        return item
+
+    def display(item):
+        nonlocal last_display
+        # Show messages raised by the worker stages
+        while engine.messages:
+            kind, message = engine.messages.popleft()
+            getattr(st, kind)(message)
+        if channel is not None:
+            return
+
+        # Display the image in Streamlit
+        FRAME_WINDOW.image(item['img'])
+
+        # Maintain the target frame rate
+        elapsed_time = time.time() - last_display
+        if elapsed_time < time_per_frame:
+            time.sleep(time_per_frame - elapsed_time)
+        last_display = time.time()
+
+    # Capture, inference and compositing each run on their own worker so
+    # inference for the next frame overlaps compositing of the current one
+    pipeline = PainterPipeline(
+        Stage('capture', capture),
+        [Stage('inference', infer), Stage('composite', composite)],
+        sink=Stage('display', display),
+    )
+    def show_status():
+        # Streamlit can only stop or rerun the script inside an st.* call, and with the
+        # MJPEG stream nothing else in this loop makes one, so update the stats regularly
+        nonlocal last_status
+        if time.time() - last_status < 0.5:
+            return
+        last_status = time.time()
+        status.caption(" · ".join(f"{name} {s['mean_ms']:.1f} ms ({s['dropped']} dropped)"
+                                  for name, s in pipeline.stats().items()))
+
+    last_display = last_status = time.time()
+    pipeline.start()
+    try:
+        while run:
+            pipeline.run_sink()
+            show_status()
+    finally:
+        pipeline.stop()
+        engine.close()
+
+        # Ensure camera is released when the loop ends
+        if 'grabber' in st.session_state:
+            st.session_state.grabber.stop()
+            del st.session_state.grabber
+        if 'cap' in st.session_state:
+            st.session_state.cap.release()
+            del st.session_state.cap
+        if 'camera_initialized' in st.session_state:
+            del st.session_state.camera_initialized
+
+
+if __name__ == "__main__":
+    run_painter()
\ No newline at end of file
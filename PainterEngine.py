@@ -0,0 +1,384 @@
+# PainterEngine.py
+import os
+import time
+import cv2
+from collections import deque
+from KeyboardInput import KeyboardInput, text_sprite, blit_sprite
+from CanvasExporter import CanvasExporter
+from OverlayCache import OverlayCache
+from GestureStateMachine import GestureStateMachine, ENTER, FIRE
+from StrokeLog import StrokeLog, render_vectors, BRUSH_PEN, BRUSH_STAMP
+from UndoHistory import UndoHistory
+
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_headers(folderPath=os.path.join(ASSET_DIR, 'header')):
+    myList = sorted(os.listdir(folderPath))
+    return [cv2.imread(os.path.join(folderPath, imPath)) for imPath in myList]
+
+
+def load_guides(folderPath=os.path.join(ASSET_DIR, 'guide')):
+    # Guide images are resized to fit below the header (1280x595)
+    guideList = []
+    for imPath in sorted(os.listdir(folderPath)):
+        img = cv2.imread(os.path.join(folderPath, imPath))
+        if img is not None:
+            guideList.append(cv2.resize(img, (1280, 595)))
+    return guideList
+
+
+# Header tools: x range in the header, header image shown while hovering,
+# action and its argument. Actions run once per hover (see GestureStateMachine).
+HEADER_TOOLS = (
+    (0, 128, 1, 'save', None),
+    (128, 256, 2, 'color', (255, 0, 255)),  # Pink
+    (256, 384, 3, 'color', (255, 0, 0)),  # Blue
+    (384, 512, 4, 'color', (0, 255, 0)),  # Green
+    (512, 640, 5, 'color', (0, 255, 255)),  # Yellow
+    (640, 768, 6, 'color', (0, 0, 0)),  # Eraser
+    (768, 896, 7, 'undo', None),
+    (896, 1024, 8, 'redo', None),
+    (1024, 1152, 9, 'guide', None),
+    (1155, 1280, 10, 'keyboard', None),
+)
+
+
+class PainterEngine:
+    """Headless painter core: camera frames and hand landmarks in, composited frames out.
+
+    Holds the canvas, tool and guide state, undo/redo history and the text
+    layer. It has no Streamlit or camera dependency, so the same engine
+    backs the student and educator pages and the benchmarks. Messages meant
+    for the user are queued on ``messages`` as ``(kind, text)`` pairs; canvas
+    exports are written by a background CanvasExporter and reported there.
+    """
+
+    def __init__(self, overlayList=None, guideList=None, keyboard_input=None, save_dir=None,
+                 export_format='png', export_quality=None, export_scale=1.0, history_bytes=16 * 1024 * 1024):
+        # Variables
+        self.brushSize = 10
+        self.brushType = BRUSH_STAMP  # BRUSH_STAMP (width follows hand speed) or BRUSH_PEN
+        self.eraserSize = 100
+
+        self.overlayList = overlayList if overlayList is not None else load_headers()
+        self.guideList = guideList if guideList is not None else load_guides()
+        self.save_dir = save_dir if save_dir is not None else os.path.join(os.path.expanduser("~"), "Pictures")
+
+        # Default images
+        self.header = self.overlayList[0]
+        self.current_guide_index = 0  # Track current guide index
+        self.current_guide = None  # Initially no guide shown
+        self.show_guide = False  # Track guide visibility state
+
+        # Swipe detection variables
+        self.swipe_threshold = 50  # Minimum horizontal movement to consider a swipe
+        self.swipe_start_x = None  # To track where swipe started
+        self.swipe_active = False  # To track if swipe is in progress
+
+        # Default drawing color
+        self.drawColor = (255, 0, 255)
+
+        # Canvas: strokes are logged as vectors and rasterized into strokes.canvas
+        self.strokes = StrokeLog()
+
+        # Undo/Redo - one entry per stroke or text edit
+        self.history = UndoHistory(self.strokes, max_bytes=history_bytes)
+
+        self.keyboard_input = keyboard_input if keyboard_input is not None else KeyboardInput()
+        self.last_time = time.time()
+        self.clock = 0.0  # Seconds of processed frames, drives gesture dwell times
+        self.header_tools = GestureStateMachine([(x_min, x_max) for x_min, x_max, *_ in HEADER_TOOLS])
+        self.messages = deque()
+        self.overlays = OverlayCache()
+        self.export_scale = export_scale  # Saved images are this many times the canvas size
+        self.exporter = CanvasExporter(render=self.render_export, fmt=export_format,
+                                       quality=export_quality, on_done=self.export_done)
+
+    @property
+    def imgCanvas(self):
+        return self.strokes.canvas
+
+    def notify(self, message, kind='toast'):
+        self.messages.append((kind, message))
+
+    # Function to save current state (both canvas and text); the canvas is a
+    # copy-on-write tile snapshot, above scale 1 the strokes are kept as vectors
+    # and re-rendered at the export resolution
+    def save_state(self):
+        state = {'text_objects': self.keyboard_input.text_objects,
+                 'scale': self.export_scale}
+        if self.export_scale == 1.0:
+            state['canvas'] = self.strokes.tiles.snapshot()
+        else:
+            state['vectors'] = self.strokes.vectors()
+        return state
+
+    # Undoable edits: everything between begin_edit and end_edit is one history entry
+    def begin_edit(self):
+        self.history.begin(self.keyboard_input.text_objects)
+
+    def end_edit(self):
+        self.history.commit(self.keyboard_input.text_objects)
+
+    def run_keyboard_events(self, handler):
+        """Run ``handler(keyboard_input)``; a label it adds or removes is its own undoable edit."""
+        before = self.keyboard_input.text_objects
+        handler(self.keyboard_input)
+        after = self.keyboard_input.text_objects
+        if after is not before:
+            # Close any open edit (e.g. a text drag) as it was before the key, then record the key
+            self.history.commit(before)
+            self.history.begin(before)
+            self.history.commit(after)
+
+    def restore_text(self, text_objects):
+        if text_objects is not None:
+            self.keyboard_input.set_text_objects(text_objects)
+
+    # Function to save the canvas (encoded and written by the exporter thread)
+    def save_canvas(self):
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        base_path = os.path.join(self.save_dir, f"saved_painting_{timestamp}")
+        return self.exporter.submit(self.save_state(), base_path)
+
+    @staticmethod
+    def render_export(state):
+        # The snapshot is private to the exporter, so text is drawn on it directly
+        scale = state['scale']
+        saved_img = state['canvas'].to_array() if 'canvas' in state else render_vectors(state['vectors'], scale)
+
+        # Draw all text objects onto the saved image (outlined in their own color)
+        for obj in state['text_objects']:
+            position = (int(obj.position[0] * scale), int(obj.position[1] * scale))
+            thickness = max(1, int(round(obj.thickness * scale)))
+            sprite = text_sprite(obj.text, obj.font, obj.scale * scale, obj.color, thickness,
+                                 obj.color, thickness + 2)
+            blit_sprite(saved_img, sprite, position)
+        return saved_img
+
+    def export_done(self, path, error):
+        if error is None:
+            self.notify(f"Canvas Saved at {path}", 'success')
+        else:
+            self.notify(f"Could not save canvas: {error}", 'error')
+
+    def close(self):
+        # Finish pending exports
+        self.exporter.stop()
+
+    def process(self, img, lmList, fingers, dt=None):
+        """Run one frame: apply the hand gesture, then composite the canvas, header,
+        text and guide onto ``img`` (BGR, mirrored). Returns the composited frame.
+
+        ``lmList`` and ``fingers`` use the ``findPosition`` / ``fingersUp`` formats,
+        or one hand's rows of ``findLandmarks`` / ``fingersUpAll``.
+        ``dt`` (cursor blink and gesture dwell time) defaults to the wall-clock
+        time since the previous frame. Pass ``img=None`` for offline processing:
+        only the canvas and tool state are updated, nothing is composited, and
+        the canvas is returned.
+        """
+        if dt is None:
+            current_time = time.time()
+            dt = current_time - self.last_time
+            self.last_time = current_time
+        self.clock += dt
+
+        if img is None:
+            self.handle_hand(None, lmList, fingers)
+            return self.imgCanvas
+
+        # White hint text with a black outline (pre-rendered sprite)
+        blit_sprite(img, text_sprite("Selection Mode - Two Fingers Up", cv2.FONT_HERSHEY_SIMPLEX, 0.7,
+                                     (255, 255, 255), 2, (0, 0, 0), 4), (50, 150))
+
+        self.handle_hand(img, lmList, fingers)
+
+        # Advance the keyboard cursor blink
+        self.keyboard_input.update(dt)
+
+        return self.composite(img)
+
+    def run_header_events(self, events):
+        for event, index in events:
+            _, _, header_index, action, arg = HEADER_TOOLS[index]
+            if event == ENTER:
+                self.header = self.overlayList[header_index]
+            elif event == FIRE:
+                getattr(self, 'tool_' + action)(arg)
+
+    def tool_save(self, _):
+        self.save_canvas()
+        self.show_guide = False
+
+    def tool_color(self, color):
+        self.drawColor = color
+        self.show_guide = False
+        self.keyboard_input.active = False  # Close keyboard input if open
+        if color == (0, 0, 0):
+            # Eraser: delete selected text if any
+            self.begin_edit()
+            self.keyboard_input.delete_selected()
+            self.end_edit()
+
+    def tool_undo(self, _):
+        self.end_edit()  # An open edit would otherwise span the undo
+        if self.history.can_undo():
+            self.restore_text(self.history.undo())
+            self.show_guide = False
+
+    def tool_redo(self, _):
+        self.end_edit()
+        if self.history.can_redo():
+            self.restore_text(self.history.redo())
+            self.show_guide = False
+
+    def tool_guide(self, _):
+        self.show_guide = True  # Always show guide when selected
+        self.current_guide_index = 0  # Reset to first guide
+        self.current_guide = self.guideList[self.current_guide_index]  # Show first guide image
+        self.keyboard_input.active = False  # Close keyboard input if open
+
+    def tool_keyboard(self, _):
+        self.keyboard_input.active = True
+        self.show_guide = False
+
+    def handle_hand(self, img, lmList, fingers):
+        # Visual feedback is drawn on img unless it is None (offline processing)
+        if len(lmList) != 0:
+            # Tip of index and middle fingers
+            x1, y1 = int(lmList[8][1]), int(lmList[8][2])
+            x2, y2 = int(lmList[12][1]), int(lmList[12][2])
+
+            # A stroke or text drag ends as soon as the hand leaves that mode
+            drawing = fingers[1] and not fingers[2] and not self.show_guide and not self.keyboard_input.active
+            # Two fingers in the header band pick tools; they never drag text
+            text_dragging = (self.keyboard_input.active and fingers[1] and fingers[2]
+                             and y1 >= self.header_tools.header_height)
+            if not drawing and not text_dragging:
+                self.end_edit()
+
+            # 4. Selection Mode - Two Fingers Up (header tools fire once per hover)
+            selecting = fingers[1] and fingers[2]
+            self.run_header_events(self.header_tools.update((x1, y1) if selecting else None, self.clock))
+            if selecting:
+                self.swipe_start_x = None  # Reset swipe tracking when in selection mode
+
+                # Show selection rectangle
+                if img is not None:
+                    cv2.rectangle(img, (x1, y1 - 25), (x2, y2 + 25), self.drawColor, cv2.FILLED)
+
+            # ==================== HAND GESTURE LOGIC ====================
+            # GUIDE NAVIGATION MODE - One index finger, guide visible, keyboard not active
+            if fingers[1] and not fingers[2] and self.show_guide and not self.keyboard_input.active:
+                # Start or continue swipe gesture
+                if self.swipe_start_x is None:
+                    self.swipe_start_x = x1
+                    self.swipe_active = True
+                else:
+                    delta_x = x1 - self.swipe_start_x
+                    if abs(delta_x) > self.swipe_threshold and self.swipe_active:
+                        if delta_x > 0:
+                            # Swipe right - previous guide
+                            self.current_guide_index = max(0, self.current_guide_index - 1)
+                        else:
+                            # Swipe left - next guide
+                            self.current_guide_index = min(len(self.guideList) - 1, self.current_guide_index + 1)
+
+                        self.current_guide = self.guideList[self.current_guide_index]
+                        self.notify(f"Guide {self.current_guide_index + 1}/{len(self.guideList)}")
+                        self.swipe_active = False  # avoid rapid multiple swipes
+
+                # Visual feedback
+                if img is not None:
+                    cv2.circle(img, (x1, y1), 15, (0, 255, 0), cv2.FILLED)
+
+            # DRAWING MODE - One index finger, guide hidden, keyboard not active
+            elif drawing:
+                self.swipe_start_x = None  # cancel swipe tracking when drawing
+                self.begin_edit()  # No-op while the stroke continues
+
+                # Eraser: Check for overlapping with existing text
+                if self.drawColor == (0, 0, 0):
+                    idx = self.keyboard_input.hit_test(x1, y1)
+                    if idx >= 0:
+                        self.keyboard_input.remove_text_object(idx)
+
+                # Visual feedback
+                if img is not None:
+                    cv2.circle(img, (x1, y1), 15, self.drawColor, cv2.FILLED)
+
+                if not self.strokes.drawing:
+                    if self.drawColor == (0, 0, 0):  # Eraser keeps a hard, fixed width
+                        self.strokes.begin(self.drawColor, self.eraserSize, BRUSH_PEN)
+                    else:
+                        self.strokes.begin(self.drawColor, self.brushSize, self.brushType)
+
+                # Smooth drawing (on the canvas only; compositing puts it on the frame)
+                self.strokes.add_point(x1, y1)
+
+            # TEXT DRAGGING MODE - Two fingers below the header, keyboard active
+            elif text_dragging:
+                center_x = (x1 + x2) // 2
+                center_y = (y1 + y2) // 2
+
+                self.begin_edit()  # The drag is recorded when the fingers leave this mode
+                if not self.keyboard_input.dragging:
+                    if self.keyboard_input.text or self.keyboard_input.cursor_visible:
+                        self.keyboard_input.check_drag_start(center_x, center_y)
+                else:
+                    self.keyboard_input.update_drag(center_x, center_y)
+
+                # Visual feedback
+                if img is not None:
+                    cv2.circle(img, (center_x, center_y), 15, (0, 255, 255), cv2.FILLED)
+
+            else:
+                # Reset states when fingers not up or mode not active
+                self.swipe_start_x = None
+                self.swipe_active = False
+                if self.keyboard_input.dragging:
+                    self.keyboard_input.end_drag()
+
+        else:
+            # No hand detected: reset everything
+            self.end_edit()
+            self.run_header_events(self.header_tools.update(None, self.clock))
+            self.swipe_start_x = None
+            self.swipe_active = False
+            if self.keyboard_input.dragging:
+                self.keyboard_input.end_drag()
+
+    def composite(self, img):
+        # 8. Paint the canvas over the frame wherever it has ink (mask kept up to date per tile)
+        cv2.copyTo(self.imgCanvas, self.strokes.tiles.ink_mask(), img)
+
+        # 9. Set Header Image
+        img[0:125, 0:1280] = self.header
+
+        # 10. Draw keyboard text and placeholder
+        if self.keyboard_input.active:
+            # Draw semi-transparent typing area background (dark gray, 30%)
+            self.overlays.apply_typing_area(img)
+
+            self.keyboard_input.draw(img)
+
+            # Draw instruction text
+            instruction_text = "Press Enter to confirm text, ESC to cancel"
+            blit_sprite(img, text_sprite(instruction_text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1,
+                                         (200, 200, 200), 1), (20, 700))
+        else:
+            # Draw existing text objects even when keyboard is inactive
+            self.keyboard_input.draw(img)
+
+        # 11. Display Guide Image if active
+        if self.show_guide and self.current_guide is not None:
+            # Blend the guide (30%) with the camera feed and canvas (30%), in place
+            self.overlays.apply_guide(img, self.current_guide, self.guideList)
+
+            # Display guide navigation instructions
+            blit_sprite(img, text_sprite(f"Guide {self.current_guide_index + 1}/{len(self.guideList)}",
+                                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2, (255, 255, 255), 2),
+                        (1100, 150))
+
+        return img
@@ -0,0 +1,179 @@
+# PainterPipeline.py
+import queue
+import threading
+import time
+
+# What a stage does with a new item when its output queue is full
+DROP_OLDEST = "drop_oldest"  # Evict the oldest queued item, keep the new one
+DROP_NEWEST = "drop_newest"  # Discard the new item
+BLOCK = "block"  # Wait until the next stage catches up
+
+
+class StageStats:
+    """Latency and drop counters for one pipeline stage."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.dropped = 0
+        self.total_time = 0.0
+        self.last_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, elapsed):
+        with self.lock:
+            self.count += 1
+            self.total_time += elapsed
+            self.last_time = elapsed
+            self.max_time = max(self.max_time, elapsed)
+
+    def record_drop(self):
+        with self.lock:
+            self.dropped += 1
+
+    def as_dict(self):
+        with self.lock:
+            mean = self.total_time / self.count if self.count else 0.0
+            return {
+                'count': self.count,
+                'dropped': self.dropped,
+                'mean_ms': mean * 1000,
+                'last_ms': self.last_time * 1000,
+                'max_ms': self.max_time * 1000,
+            }
+
+
+class Stage:
+    """One pipeline step: ``func(item)`` returns the item for the next stage, or None to drop it."""
+
+    def __init__(self, name, func, maxsize=1, drop_policy=DROP_OLDEST):
+        if drop_policy not in (DROP_OLDEST, DROP_NEWEST, BLOCK):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.name = name
+        self.func = func
+        self.maxsize = maxsize
+        self.drop_policy = drop_policy
+        self.stats = StageStats()
+
+    def process(self, item):
+        start = time.perf_counter()
+        result = self.func(item)
+        self.stats.record(time.perf_counter() - start)
+        return result
+
+
+class PainterPipeline:
+    """Runs capture -> ... -> display as stages joined by bounded queues.
+
+    The source and every stage run on their own worker thread, so inference
+    for frame N+1 overlaps with compositing and display of frame N and the
+    frame rate is set by the slowest stage. The sink runs on the caller's
+    thread through ``run_sink`` because Streamlit elements may only be
+    updated from the script thread.
+    """
+
+    def __init__(self, source, stages, sink=None):
+        self.source = source
+        self.stages = list(stages)
+        self.sink = sink
+        # queues[i] feeds stages[i]; the last queue feeds the sink
+        self.queues = [queue.Queue(maxsize=stage.maxsize) for stage in [source] + self.stages]
+        self.running = False
+        self.threads = []
+        self.error = None  # First exception raised by a worker stage
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self.error = None
+        workers = [(self.source, None, self.queues[0])]
+        for i, stage in enumerate(self.stages):
+            workers.append((stage, self.queues[i], self.queues[i + 1]))
+
+        for stage, inbox, outbox in workers:
+            thread = threading.Thread(target=self._worker, args=(stage, inbox, outbox),
+                                      name=f"PainterPipeline-{stage.name}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def _put(self, stage, outbox, item):
+        if stage.drop_policy == BLOCK:
+            while self.running:
+                try:
+                    outbox.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+            return
+
+        try:
+            outbox.put_nowait(item)
+            return
+        except queue.Full:
+            pass
+
+        if stage.drop_policy == DROP_NEWEST:
+            stage.stats.record_drop()
+            return
+
+        # DROP_OLDEST: make room for the newest item
+        try:
+            outbox.get_nowait()
+            stage.stats.record_drop()
+        except queue.Empty:
+            pass
+        try:
+            outbox.put_nowait(item)
+        except queue.Full:
+            stage.stats.record_drop()
+
+    def _worker(self, stage, inbox, outbox):
+        while self.running:
+            if inbox is None:
+                item = None
+            else:
+                try:
+                    item = inbox.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+
+            try:
+                result = stage.process(item)
+            except Exception as e:
+                # Stop everything and let run_sink re-raise on the script thread
+                if self.error is None:
+                    self.error = e
+                self.running = False
+                return
+            if result is not None:
+                self._put(stage, outbox, result)
+
+    def run_sink(self, timeout=1.0):
+        """Hand the newest finished item to the sink on the calling thread.
+
+        Re-raises the exception of a stage that failed on its worker thread.
+        """
+        if self.error is not None:
+            raise self.error
+        try:
+            item = self.queues[-1].get(timeout=timeout)
+        except queue.Empty:
+            if self.error is not None:
+                raise self.error
+            return None
+        if self.sink is None:
+            return item
+        return self.sink.process(item)
+
+    def stats(self):
+        stages = [self.source] + self.stages + ([self.sink] if self.sink else [])
+        return {stage.name: stage.stats.as_dict() for stage in stages}
+
+    def stop(self):
+        self.running = False
+        for thread in self.threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=1.0)
+        self.threads = []
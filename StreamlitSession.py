@@ -0,0 +1,18 @@
+# StreamlitSession.py
+
+
+def current_session_id():
+    """Id of the Streamlit session running this script, or "default" outside Streamlit."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "default"
+
+
+def is_active_session(session_id):
+    """Whether the session is still connected; True when that cannot be checked."""
+    try:
+        from streamlit import runtime
+        return runtime.get_instance().is_active_session(session_id)
+    except Exception:
+        return True
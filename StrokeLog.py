@@ -0,0 +1,389 @@
+# StrokeLog.py
+import math
+from functools import lru_cache
+import cv2
+import numpy as np
+from TiledCanvas import TiledCanvas, distinct_tiles
+
+
+def _grow(array, size):
+    # Double the capacity of a typed array when it is full
+    if size <= len(array):
+        return array
+    grown = np.empty((max(size, 2 * len(array)),) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def _keep(array, start, stop, min_size):
+    # New array holding array[start:stop] at the front, with room to grow
+    kept = np.empty((max(min_size, 2 * (stop - start)),) + array.shape[1:], dtype=array.dtype)
+    kept[:stop - start] = array[start:stop]
+    return kept
+
+
+@lru_cache(maxsize=None)
+def _bezier_weights(n):
+    # Quadratic Bezier weights for n + 1 evenly spaced samples, as (n + 1, 1) columns
+    t = np.linspace(0.0, 1.0, n + 1, dtype=np.float32)[:, None]
+    return (1 - t) ** 2, 2 * (1 - t) * t, t ** 2
+
+
+class StrokeRenderer:
+    """Rasterizes one stroke from its per-frame fingertip points.
+
+    The path is smoothed with quadratic curves through the midpoints of
+    consecutive points (each frame point is a control point), sampled every
+    ``sample_px`` pixels of movement and drawn with one ``cv2.polylines``
+    call per frame, so the cost follows the distance moved. Drawing lags
+    half a segment behind the finger; ``finish`` draws the rest.
+    """
+
+    def __init__(self, color, width, sample_px=4):
+        self.color = tuple(int(c) for c in color)
+        self.width = int(width)
+        self.sample_px = sample_px
+        self.last = None  # Last frame point
+        self.tail = None  # Where the drawn path currently ends
+
+    def add(self, canvas, point):
+        """Draw up to the new point; returns the (x0, y0, x1, y1) box that was drawn."""
+        point = np.asarray(point, np.float32)
+        if self.last is None:
+            self.last = self.tail = point
+            curve = point[None]
+        else:
+            mid = (self.last + point) / 2
+            curve = self._curve(self.tail, self.last, mid)
+            self.last, self.tail = point, mid
+        return self._draw(canvas, curve)
+
+    def finish(self, canvas):
+        """Draw the remaining half segment to the last point."""
+        if self.last is None or np.array_equal(self.tail, self.last):
+            return None
+        box = self._draw(canvas, np.stack([self.tail, self.last]))
+        self.tail = self.last
+        return box
+
+    def _curve(self, start, control, end):
+        length = math.hypot(*(control - start)) + math.hypot(*(end - control))
+        a, b, c = _bezier_weights(int(min(64, max(1, length // self.sample_px))))
+        return a * start + b * control + c * end
+
+    def _draw(self, canvas, curve):
+        pts = np.rint(curve).astype(np.int32)
+        if len(pts) == 1:
+            pts = np.repeat(pts, 2, axis=0)  # A single point still leaves a dot
+        cv2.polylines(canvas, [pts], False, self.color, self.width)
+        pad = self.width // 2 + 2
+        (x0, y0), (x1, y1) = pts.min(axis=0), pts.max(axis=0)
+        return int(x0) - pad, int(y0) - pad, int(x1) + pad, int(y1) + pad
+
+
+@lru_cache(maxsize=None)
+def _disc_offsets(radius):
+    # (dy, dx) of the pixels in a filled circle of the given radius: the brush stamp
+    d = np.arange(-radius, radius + 1)
+    dy, dx = np.meshgrid(d, d, indexing='ij')
+    inside = dy * dy + dx * dx <= radius * radius + radius  # Rounder small discs
+    return dy[inside].astype(np.int32), dx[inside].astype(np.int32)
+
+
+class StampRenderer(StrokeRenderer):
+    """Brush that stamps filled discs along the smoothed path.
+
+    The stamp radius follows the hand: it shrinks as the fingertip moves
+    faster (pixels per frame, so replays are identical) and is smoothed
+    between frames. Stamps are spaced at most half a radius apart, so fast
+    strokes have no gaps, and all stamps of a frame are written with one
+    vectorized index assignment per stamp size.
+    """
+
+    def __init__(self, color, width, sample_px=4, scale=1.0, min_factor=0.45, slow_speed=8, fast_speed=90):
+        super().__init__(color, width, sample_px)
+        self.color = np.array(self.color, np.uint8)
+        self.scale = scale  # Export scale; speeds are measured at canvas size
+        self.min_factor = min_factor  # Width at or above fast_speed, relative to the brush size
+        self.slow_speed = slow_speed
+        self.fast_speed = fast_speed
+        self.radius = width / 2
+        self.radii = (self.radius, self.radius)  # Radius at the start and end of the part being drawn
+
+    def add(self, canvas, point):
+        point = np.asarray(point, np.float32)
+        target = self.radius
+        if self.last is not None:
+            speed = math.hypot(*(point - self.last)) / self.scale
+            t = min(1.0, max(0.0, (speed - self.slow_speed) / (self.fast_speed - self.slow_speed)))
+            target = self.width / 2 * (1 - (1 - self.min_factor) * t)
+        new_radius = 0.6 * self.radius + 0.4 * target
+        self.radii = (self.radius, new_radius)
+        self.radius = new_radius
+        return super().add(canvas, point)
+
+    def finish(self, canvas):
+        self.radii = (self.radius, self.radius)
+        return super().finish(canvas)
+
+    def _draw(self, canvas, curve):
+        # Resample the path so consecutive stamps overlap
+        steps = np.hypot(*np.diff(curve, axis=0).T) if len(curve) > 1 else np.zeros(0, np.float32)
+        along = np.concatenate([[0.0], np.cumsum(steps)])
+        spacing = max(1.0, min(self.radii) / 2)
+        at = np.arange(0.0, along[-1] + spacing / 2, spacing) if along[-1] > 0 else np.zeros(1)
+        xs = np.interp(at, along, curve[:, 0])
+        ys = np.interp(at, along, curve[:, 1])
+        radii = np.rint(np.interp(at, [0.0, max(along[-1], 1e-6)], self.radii)).astype(np.int32)
+        radii = np.maximum(radii, 1)
+
+        h, w = canvas.shape[:2]
+        cx, cy = np.rint(xs).astype(np.int32), np.rint(ys).astype(np.int32)
+        for radius in np.unique(radii):
+            dy, dx = _disc_offsets(int(radius))
+            sel = radii == radius
+            py = (cy[sel, None] + dy).ravel()
+            px = (cx[sel, None] + dx).ravel()
+            keep = (py >= 0) & (py < h) & (px >= 0) & (px < w)
+            canvas[py[keep], px[keep]] = self.color
+
+        pad = int(radii.max()) + 1
+        return int(cx.min()) - pad, int(cy.min()) - pad, int(cx.max()) + pad, int(cy.max()) + pad
+
+
+# Brush types stored per stroke
+BRUSH_PEN = 0  # Fixed-width polyline (also used by the eraser)
+BRUSH_STAMP = 1  # Speed-dependent disc stamps
+
+
+def make_renderer(brush, color, width, scale=1.0):
+    if brush == BRUSH_STAMP:
+        return StampRenderer(color, max(1, int(round(int(width) * scale))), scale=scale)
+    return StrokeRenderer(color, max(1, int(round(int(width) * scale))))
+
+
+def _replay_stroke(canvas, points, color, width, brush, scale=1.0):
+    if scale != 1.0:
+        points = points * scale
+    renderer = make_renderer(brush, color, width, scale)
+    for point in points:
+        renderer.add(canvas, point)
+    renderer.finish(canvas)
+
+
+def render_vectors(vectors, scale=1.0):
+    """Rasterize ``StrokeLog.vectors()`` onto a new canvas ``scale`` times the original size.
+
+    Strokes folded into the log's base checkpoint are only available as
+    pixels, so they are resized rather than re-rendered.
+    """
+    w, h = vectors['size']
+    size = (int(w * scale), int(h * scale))
+    if vectors.get('base') is not None:
+        canvas = cv2.resize(vectors['base'].to_array(), size, interpolation=cv2.INTER_NEAREST)
+    else:
+        canvas = np.zeros((size[1], size[0], 3), np.uint8)
+    for start, end, color, width, brush in zip(vectors['starts'], vectors['ends'], vectors['colors'],
+                                               vectors['widths'], vectors['brushes']):
+        _replay_stroke(canvas, vectors['points'][start:end], color, width, brush, scale)
+    return canvas
+
+
+class StrokeLog:
+    """Vector record of the painter's strokes, rasterized into a cached canvas.
+
+    Each stroke is its color, width, brush and the fingertip position of every
+    frame it was drawn in, stored in flat typed arrays (a few bytes per
+    frame). New points are rasterized straight into ``canvas``. The log can
+    seek back to any earlier stroke count by restoring the nearest
+    checkpoint (a copy-on-write tile snapshot taken every
+    ``checkpoint_every`` strokes) and replaying the strokes after it, and
+    can re-render the whole drawing at another resolution for export.
+
+    ``compact`` bounds the memory: the strokes before a checkpoint are folded
+    into it (it becomes the base and ``first`` moves up to it), and their
+    points and the older checkpoints are dropped. Stroke numbers stay
+    absolute; the log just can no longer seek before ``first``.
+    """
+
+    def __init__(self, size=(1280, 720), checkpoint_every=32, tile=64):
+        w, h = size
+        self.tiles = TiledCanvas((h, w, 3), tile)
+        self.canvas = self.tiles.array
+        self.checkpoint_every = checkpoint_every
+
+        self.points = np.empty((1024, 2), np.int16)  # Fingertip per frame, all strokes back to back
+        self.starts = np.empty(64, np.int32)  # Index of each stroke's first point
+        self.ends = np.empty(64, np.int32)
+        self.colors = np.empty((64, 3), np.uint8)
+        self.widths = np.empty(64, np.uint16)
+        self.brushes = np.empty(64, np.uint8)
+        self.n_points = 0
+        self.first = 0  # Stroke number of the base checkpoint; arrays start at this stroke
+        self.total = 0  # Strokes stored (the ones past ``count`` can be redone)
+        self.count = 0  # Strokes currently on the canvas
+        self.blank = self.tiles.snapshot()
+        self.checkpoints = {0: self.blank}  # stroke count -> CanvasSnapshot
+        self.checkpoint_bytes = None  # Cached size of the checkpoints
+
+        self.drawing = False
+        self.renderer = None  # StrokeRenderer of the open stroke
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        return self.history_nbytes + self.base_nbytes
+
+    @property
+    def base_nbytes(self):
+        # Tiles of the base checkpoint: needed by the live canvas, never freed by compact
+        return sum(t.nbytes for t in distinct_tiles(self.checkpoints[self.first].tiles))
+
+    @property
+    def history_nbytes(self):
+        """Bytes ``compact`` can free: the stroke records and the checkpoints after the base."""
+        if self.checkpoint_bytes is None:
+            # Checkpoints share unchanged tiles, so count each tile once, and not at all
+            # when it is shared with the base
+            base = {id(t) for t in distinct_tiles(self.checkpoints[self.first].tiles)}
+            tiles = distinct_tiles(t for c, snapshot in self.checkpoints.items() if c != self.first
+                                   for t in snapshot.tiles)
+            self.checkpoint_bytes = sum(t.nbytes for t in tiles if id(t) not in base)
+        return (self.points.nbytes + self.starts.nbytes + self.ends.nbytes + self.colors.nbytes +
+                self.widths.nbytes + self.brushes.nbytes + self.checkpoint_bytes)
+
+    def next_checkpoint(self):
+        """Smallest checkpoint after the base (the nearest point ``compact`` can fold to), or None."""
+        return min((c for c in self.checkpoints if c > self.first), default=None)
+
+    def begin(self, color, width, brush=BRUSH_PEN):
+        """Start a stroke. Strokes that were undone are discarded."""
+        self.end()
+        self._truncate(self.count)
+        i = self.count - self.first
+        self.starts = _grow(self.starts, i + 1)
+        self.ends = _grow(self.ends, i + 1)
+        self.colors = _grow(self.colors, i + 1)
+        self.widths = _grow(self.widths, i + 1)
+        self.brushes = _grow(self.brushes, i + 1)
+        self.starts[i] = self.ends[i] = self.n_points
+        self.colors[i] = color
+        self.widths[i] = width
+        self.brushes[i] = brush
+        self.drawing = True
+        self.renderer = make_renderer(brush, color, width)
+
+    def add_point(self, x, y):
+        """Extend the open stroke to (x, y), drawing it on the canvas."""
+        self.points = _grow(self.points, self.n_points + 1)
+        self.points[self.n_points] = (x, y)
+        self.n_points += 1
+        self.ends[self.count - self.first] = self.n_points
+        self.tiles.mark(*self.renderer.add(self.canvas, (x, y)))
+
+    def end(self):
+        """Close the open stroke. Returns True if it drew anything."""
+        if not self.drawing:
+            return False
+        self.drawing = False
+        box = self.renderer.finish(self.canvas)
+        if box is not None:
+            self.tiles.mark(*box)
+        self.renderer = None
+        i = self.count - self.first
+        if self.ends[i] == self.starts[i]:
+            return False
+        self.count += 1
+        self.total = self.count
+        if self.count % self.checkpoint_every == 0:
+            self.checkpoints[self.count] = self.tiles.snapshot()
+            self.checkpoint_bytes = None
+        return True
+
+    def add_stroke(self, points, color, width, brush=BRUSH_PEN):
+        """Record a whole stroke at once."""
+        self.begin(color, width, brush)
+        for x, y in points:
+            self.add_point(x, y)
+        return self.end()
+
+    def seek(self, count):
+        """Show only the first ``count`` strokes (undo when going back, redo when going forward)."""
+        self.end()
+        count = max(self.first, min(count, self.total))
+        if count < self.count:
+            base = max(c for c in self.checkpoints if c <= count)
+            self.tiles.restore(self.checkpoints[base])
+            self.count = base
+        for i in range(self.count, count):
+            self._replay(self.canvas, i)
+        self.count = count
+
+    def vectors(self):
+        """Copy of the visible strokes (kilobytes), for rendering on another thread."""
+        n = self.count - self.first
+        points = self.points[:self.ends[n - 1]].copy() if n else self.points[:0].copy()
+        return {
+            'size': self.canvas.shape[1::-1],
+            'base': self.checkpoints[self.first] if self.first else None,  # Immutable, safe to share
+            'points': points,
+            'starts': self.starts[:n].copy(),
+            'ends': self.ends[:n].copy(),
+            'colors': self.colors[:n].copy(),
+            'widths': self.widths[:n].copy(),
+            'brushes': self.brushes[:n].copy(),
+        }
+
+    def render(self, scale=1.0):
+        """Rasterize the visible strokes onto a new canvas ``scale`` times the size."""
+        return render_vectors(self.vectors(), scale)
+
+    def clear(self):
+        self.end()
+        self.n_points = 0
+        self.first = self.count = self.total = 0
+        self.checkpoints = {0: self.blank}
+        self.checkpoint_bytes = None
+        self.tiles.restore(self.blank)
+
+    def compact(self, count):
+        """Fold the strokes before ``count`` (down to the nearest checkpoint) into the base.
+
+        They stay on the canvas but can no longer be undone. Returns True if
+        anything was dropped.
+        """
+        base = max(c for c in self.checkpoints if c <= max(self.first, count))
+        if base <= self.first:
+            return False
+        drop = base - self.first
+        n = self.total - base + (1 if self.drawing else 0)  # Stored strokes, plus the open one
+        p0 = int(self.starts[drop]) if n else self.n_points  # No stroke after the base: drop every point
+        self.points = _keep(self.points, p0, self.n_points, 1024)
+        self.n_points -= p0
+        self.starts = _keep(self.starts, drop, drop + n, 64) - p0
+        self.ends = _keep(self.ends, drop, drop + n, 64) - p0
+        self.colors = _keep(self.colors, drop, drop + n, 64)
+        self.widths = _keep(self.widths, drop, drop + n, 64)
+        self.brushes = _keep(self.brushes, drop, drop + n, 64)
+        self.checkpoints = {c: data for c, data in self.checkpoints.items() if c >= base}
+        self.checkpoint_bytes = None
+        self.first = base
+        return True
+
+    def _replay(self, canvas, i):
+        i -= self.first
+        points = self.points[self.starts[i]:self.ends[i]]
+        _replay_stroke(canvas, points, self.colors[i], self.widths[i], self.brushes[i])
+        pad = int(self.widths[i]) // 2 + 2
+        (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+        self.tiles.mark(int(x0) - pad, int(y0) - pad, int(x1) + pad, int(y1) + pad)
+
+    def _truncate(self, count):
+        # Forget strokes from ``count`` on, with the checkpoints taken after them
+        if count < self.total:
+            self.n_points = int(self.starts[count - self.first])
+            self.total = count
+            self.checkpoints = {c: data for c, data in self.checkpoints.items() if c <= count}
+            self.checkpoint_bytes = None
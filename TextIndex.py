@@ -0,0 +1,86 @@
+# TextIndex.py
+from bisect import bisect_left
+from collections import defaultdict
+
+
+class TextIndex:
+    """Uniform grid of text bounding boxes for point hit-tests.
+
+    Boxes are ``(left, top, right, bottom)`` in pixels. The grid stores
+    stable object ids, handed out in increasing order as objects are added,
+    so ``ids`` (position in the text layer tuple -> id) stays sorted and
+    removing an object only touches its own cells. A hit-test only looks at
+    the objects in the cell under the point. ``source`` is the tuple the
+    index was built for; ``sync`` rebuilds it when the layer was replaced
+    wholesale (undo, load).
+    """
+
+    def __init__(self, cell=128):
+        self.cell = cell
+        self.cells = defaultdict(set)  # (cx, cy) -> ids
+        self.boxes = {}  # id -> box
+        self.ids = []  # Position in the text layer -> id, ascending
+        self.next_id = 0
+        self.source = None
+
+    def _cells(self, box):
+        left, top, right, bottom = box
+        for cy in range(top // self.cell, bottom // self.cell + 1):
+            for cx in range(left // self.cell, right // self.cell + 1):
+                yield cx, cy
+
+    def _add(self, box):
+        obj_id = self.next_id
+        self.next_id += 1
+        self.ids.append(obj_id)
+        self.boxes[obj_id] = box
+        for key in self._cells(box):
+            self.cells[key].add(obj_id)
+
+    def _discard(self, obj_id):
+        for key in self._cells(self.boxes[obj_id]):
+            cell = self.cells[key]
+            cell.discard(obj_id)
+            if not cell:
+                del self.cells[key]
+
+    def sync(self, text_objects, box_of):
+        """Rebuild from ``text_objects`` unless the index already describes that tuple."""
+        if text_objects is self.source:
+            return
+        self.cells.clear()
+        self.boxes = {}
+        self.ids = []
+        for obj in text_objects:
+            self._add(box_of(obj))
+        self.source = text_objects
+
+    def append(self, text_objects, box):
+        """Index the object just appended as the last item of ``text_objects``."""
+        self._add(box)
+        self.source = text_objects
+
+    def move(self, text_objects, i, box):
+        """Update object ``i``'s box after it moved."""
+        obj_id = self.ids[i]
+        self._discard(obj_id)
+        self.boxes[obj_id] = box
+        for key in self._cells(box):
+            self.cells[key].add(obj_id)
+        self.source = text_objects
+
+    def remove(self, text_objects, i):
+        """Drop object ``i``; later objects shift down one position, as in the tuple."""
+        obj_id = self.ids.pop(i)
+        self._discard(obj_id)
+        del self.boxes[obj_id]
+        self.source = text_objects
+
+    def hit(self, x, y):
+        """Position of the topmost (last added) object whose box contains (x, y), or -1."""
+        best = -1
+        for obj_id in self.cells.get((x // self.cell, y // self.cell), ()):
+            left, top, right, bottom = self.boxes[obj_id]
+            if obj_id > best and left <= x <= right and top <= y <= bottom:
+                best = obj_id
+        return -1 if best < 0 else bisect_left(self.ids, best)
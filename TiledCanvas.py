@@ -0,0 +1,121 @@
+# TiledCanvas.py
+import numpy as np
+
+
+def distinct_tiles(tiles):
+    # Tiles that are views of one buffer (the shared blank tile) count once
+    buffers = {}
+    for t in tiles:
+        base = t.base if t.base is not None else t
+        buffers[id(base)] = base
+    return buffers.values()
+
+
+class CanvasSnapshot:
+    """Immutable canvas state: a grid of read-only tiles shared with other snapshots."""
+
+    __slots__ = ('shape', 'tile', 'tiles')
+
+    def __init__(self, shape, tile, tiles):
+        self.shape = shape
+        self.tile = tile
+        self.tiles = tiles  # Row-major tuple of arrays
+
+    @property
+    def nbytes(self):
+        # Bytes of distinct tiles (tiles shared with other snapshots are counted here too)
+        return sum(t.nbytes for t in distinct_tiles(self.tiles))
+
+    def to_array(self):
+        """Assemble the tiles into a new contiguous image."""
+        img = np.empty(self.shape, np.uint8)
+        size = self.tile
+        cols = -(-self.shape[1] // size)
+        for i, tile in enumerate(self.tiles):
+            y, x = (i // cols) * size, (i % cols) * size
+            img[y:y + tile.shape[0], x:x + tile.shape[1]] = tile
+        return img
+
+
+class TiledCanvas:
+    """Contiguous canvas with copy-on-write tile snapshots.
+
+    Drawing happens on ``array`` as usual; callers report the rectangles
+    they touched with ``mark``. ``snapshot`` copies only the tiles marked
+    since the previous snapshot and shares every other tile by reference,
+    and ``restore`` writes back only the tiles that differ from the current
+    state, so both cost O(touched tiles) instead of a full-frame copy.
+
+    ``ink_mask`` is a per-pixel mask of painted (non-black) pixels, kept up
+    to date the same way: only tiles modified since the last call are
+    recomputed.
+    """
+
+    def __init__(self, shape=(720, 1280, 3), tile=64):
+        self.array = np.zeros(shape, np.uint8)
+        self.tile = tile
+        self.rows = -(-shape[0] // tile)
+        self.cols = -(-shape[1] // tile)
+        self.dirty = np.zeros((self.rows, self.cols), bool)  # Modified since the last snapshot
+        self.mask = np.zeros(shape[:2], np.uint8)  # 1 where the canvas has ink
+        self.mask_dirty = np.zeros((self.rows, self.cols), bool)  # Modified since the last ink_mask
+
+        # Every tile starts as a view of one shared, read-only blank tile
+        blank = np.zeros((tile, tile) + shape[2:], np.uint8)
+        blank.setflags(write=False)
+        self.tiles = [blank[:self._tile_height(r), :self._tile_width(c)]
+                      for r in range(self.rows) for c in range(self.cols)]
+
+    def _tile_height(self, row):
+        return min(self.tile, self.array.shape[0] - row * self.tile)
+
+    def _tile_width(self, col):
+        return min(self.tile, self.array.shape[1] - col * self.tile)
+
+    def mark(self, x0, y0, x1, y1):
+        """Flag the tiles overlapping the pixel rectangle (x0, y0)-(x1, y1) as modified."""
+        h, w = self.array.shape[:2]
+        x0, x1 = max(0, min(x0, x1)), min(w - 1, max(x0, x1))
+        y0, y1 = max(0, min(y0, y1)), min(h - 1, max(y0, y1))
+        if x0 > x1 or y0 > y1:
+            return
+        rows = slice(y0 // self.tile, y1 // self.tile + 1)
+        cols = slice(x0 // self.tile, x1 // self.tile + 1)
+        self.dirty[rows, cols] = True
+        self.mask_dirty[rows, cols] = True
+
+    def mark_all(self):
+        self.dirty[:] = True
+        self.mask_dirty[:] = True
+
+    def ink_mask(self):
+        """Mask of painted pixels, recomputed only in tiles modified since the last call."""
+        size = self.tile
+        for r, c in zip(*np.nonzero(self.mask_dirty)):
+            y, x = r * size, c * size
+            np.any(self.array[y:y + size, x:x + size], axis=2, out=self.mask[y:y + size, x:x + size].view(bool))
+        self.mask_dirty[:] = False
+        return self.mask
+
+    def snapshot(self):
+        """Current state; copies the modified tiles only."""
+        size = self.tile
+        for r, c in zip(*np.nonzero(self.dirty)):
+            y, x = r * size, c * size
+            tile = self.array[y:y + size, x:x + size].copy()
+            tile.setflags(write=False)
+            self.tiles[r * self.cols + c] = tile
+        self.dirty[:] = False
+        return CanvasSnapshot(self.array.shape, size, tuple(self.tiles))
+
+    def restore(self, snapshot):
+        """Make the canvas equal to ``snapshot``, writing back only the tiles that differ."""
+        size = self.tile
+        dirty = self.dirty.ravel()
+        for i, tile in enumerate(snapshot.tiles):
+            if tile is not self.tiles[i] or dirty[i]:
+                y, x = (i // self.cols) * size, (i % self.cols) * size
+                self.array[y:y + tile.shape[0], x:x + tile.shape[1]] = tile
+                self.mask_dirty.flat[i] = True
+        self.tiles = list(snapshot.tiles)
+        self.dirty[:] = False
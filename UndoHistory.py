@@ -0,0 +1,124 @@
+# UndoHistory.py
+from collections import deque
+
+
+class UndoEntry:
+    """One undoable edit: the stroke count before and after it, and the text
+    layer before and after if it changed."""
+
+    __slots__ = ('strokes_before', 'strokes_after', 'text_before', 'text_after', 'nbytes')
+
+    def __init__(self, strokes_before, strokes_after, text_before, text_after):
+        self.strokes_before = strokes_before
+        self.strokes_after = strokes_after
+        self.text_before = text_before
+        self.text_after = text_after
+        # Text layers are tuples of shared immutable records: only the tuples themselves are new
+        self.nbytes = 64 + 8 * (len(text_before) + len(text_after) if text_before is not None else 0)
+
+
+class UndoHistory:
+    """Undo/redo for the painter canvas and text layer with bounded memory.
+
+    The canvas lives in a StrokeLog, so an entry only needs the stroke count
+    before and after the edit; undo and redo seek the log, which replays from
+    its nearest checkpoint. An edit (a stroke, a text drag, deleting text) is
+    bracketed by ``begin`` and ``commit``. ``max_bytes`` covers the entries
+    and the part of the stroke log that compaction can free (everything but
+    its base checkpoint, which the live canvas needs anyway). Once they
+    exceed it, the oldest entries up to the log's next checkpoint are
+    dropped and the strokes before it are folded into the base; entries are
+    only dropped when that frees memory.
+    """
+
+    def __init__(self, strokes, max_bytes=16 * 1024 * 1024):
+        self.strokes = strokes
+        self.max_bytes = max_bytes
+        self.undo_entries = deque()
+        self.redo_entries = deque()
+        self.nbytes = 0
+
+        self.strokes_baseline = 0  # Stroke count at the start of the open edit
+        self.text_baseline = None
+        self.open = False
+
+    def __len__(self):
+        return len(self.undo_entries)
+
+    def can_undo(self):
+        return len(self.undo_entries) > 0
+
+    def can_redo(self):
+        return len(self.redo_entries) > 0
+
+    def begin(self, text_objects):
+        """Start an edit; does nothing if one is already open."""
+        if self.open:
+            return
+        self.strokes_baseline = self.strokes.count
+        self.text_baseline = text_objects  # Immutable tuple, shared rather than copied
+        self.open = True
+
+    def commit(self, text_objects):
+        """Close the open edit and record it if anything changed. Returns True if recorded."""
+        if not self.open:
+            return False
+        self.open = False
+        self.strokes.end()
+
+        text_before, text_after = None, None
+        if text_objects != self.text_baseline:
+            text_before, text_after = self.text_baseline, text_objects
+        self.text_baseline = None
+
+        if self.strokes.count == self.strokes_baseline and text_before is None:
+            return False
+        self._push(UndoEntry(self.strokes_baseline, self.strokes.count, text_before, text_after))
+        return True
+
+    def undo(self):
+        """Revert the newest entry. Returns the text objects to restore, or None."""
+        entry = self.undo_entries.pop()
+        self.nbytes -= entry.nbytes
+        self.redo_entries.append(entry)
+        self.strokes.seek(entry.strokes_before)
+        return entry.text_before
+
+    def redo(self):
+        """Reapply the newest undone entry. Returns the text objects to restore, or None."""
+        entry = self.redo_entries.pop()
+        self.undo_entries.append(entry)
+        self.nbytes += entry.nbytes
+        self._trim()
+        self.strokes.seek(entry.strokes_after)
+        return entry.text_after
+
+    def clear(self):
+        self.undo_entries.clear()
+        self.redo_entries.clear()
+        self.nbytes = 0
+        self.open = False
+
+    def _push(self, entry):
+        self.undo_entries.append(entry)
+        self.nbytes += entry.nbytes
+        self.redo_entries.clear()
+        self._trim()
+
+    def _drop_oldest(self):
+        self.nbytes -= self.undo_entries.popleft().nbytes
+
+    def _trim(self):
+        # Drop the oldest history first; always keep the newest entry
+        while self.nbytes + self.strokes.history_nbytes > self.max_bytes and len(self.undo_entries) > 1:
+            fold = self.strokes.next_checkpoint()
+            if fold is None or fold > self.undo_entries[-1].strokes_before:
+                # Folding the strokes would cost the newest entry; only the entries themselves can go
+                if self.nbytes <= self.max_bytes:
+                    break
+                self._drop_oldest()
+                continue
+            # Entries that undo to before the fold point can no longer be replayed
+            while self.undo_entries[0].strokes_before < fold:
+                self._drop_oldest()
+            self.strokes.compact(fold)
@@ -6,6 +6,7 @@ import sys
 from pymongo import MongoClient
 from dotenv import load_dotenv
 from register import  students_collection, access_codes_collection
+from DetectorPool import get_detector_pool
 
 # --- PAGE CONFIG ---
 st.set_page_config(
@@ -50,6 +51,10 @@ if 'user_type' not in st.session_state:
 if 'username' not in st.session_state:
     st.session_state.username = None
 
+# --- HAND DETECTOR WARM-UP ---
+# Loads MediaPipe in the background once per server so the painter pages start warm
+get_detector_pool()
+
 
 # --- STYLING ---
 def load_css():
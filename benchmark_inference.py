@@ -0,0 +1,105 @@
+# benchmark_inference.py
+"""Latency/accuracy trade-off of handDetector's inferenceScale.
+
+Runs the detector over the same frames at each scale and reports per-frame
+inference time and the landmark error against a reference. With the
+synthetic source the reference is the scripted ground truth; otherwise it
+is the full-resolution (scale 1.0) detection of the same frame.
+
+    python benchmark_inference.py --source hands.mp4 --scales 1.0 0.75 0.5 0.35 0.25
+"""
+import argparse
+import json
+import time
+import cv2
+import numpy as np
+import HandTrackingModule as htm
+from FrameSources import SyntheticHandSource, make_source
+from benchmark_painter import git_commit
+
+
+def load_frames(source, count):
+    """Read ``count`` mirrored frames, plus scripted landmarks when the source has them."""
+    frames, truth = [], []
+    while len(frames) < count:
+        success, img = source.read()
+        if not success:
+            break
+        frames.append(cv2.flip(img, 1))
+        truth.append(np.array(source.landmarks)[:, 1:] if isinstance(source, SyntheticHandSource) else None)
+    source.release()
+    return frames, truth
+
+
+def run_scale(frames, scale, roi_tracking=False, warmup=10):
+    """Per-frame times, landmarks and the detector's arena allocations after ``warmup`` frames."""
+    detector = htm.handDetector(detectionCon=0.85, inferenceScale=scale, roiTracking=roi_tracking)
+    times, positions = [], []
+    arena_start = None
+    for i, img in enumerate(frames):
+        if i == warmup:
+            arena_start = detector.arena.allocations
+        start = time.perf_counter()
+        detector.findHands(img, draw=False)
+        times.append(time.perf_counter() - start)
+        lmList = detector.findPosition(img, draw=False)
+        positions.append(np.array(lmList)[:, 1:] if lmList else None)
+    buffers = detector.arena.allocations - arena_start if arena_start is not None else None
+    return np.array(times) * 1000, positions, buffers
+
+
+def landmark_error(positions, reference):
+    """Mean pixel distance to the reference over frames where both found a hand."""
+    errors = [np.linalg.norm(p - r, axis=1).mean()
+              for p, r in zip(positions, reference) if p is not None and r is not None]
+    return float(np.mean(errors)) if errors else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', default='synthetic', help='Camera index, video path or "synthetic"')
+    parser.add_argument('--frames', type=int, default=150)
+    parser.add_argument('--scales', type=float, nargs='+', default=[1.0, 0.75, 0.5, 0.35, 0.25])
+    parser.add_argument('--roi', action='store_true', help='Also enable ROI tracking')
+    parser.add_argument('--output', default='inference_bench.json')
+    args = parser.parse_args()
+
+    source = SyntheticHandSource() if args.source == 'synthetic' else make_source(args.source)
+    frames, truth = load_frames(source, args.frames)
+    if not frames:
+        raise SystemExit(f"No frames could be read from {args.source}")
+
+    results = {'commit': git_commit(), 'source': args.source, 'frames': len(frames), 'scales': {}}
+    reference = truth if truth[0] is not None else None
+    if reference is None and 1.0 not in args.scales:
+        args.scales = [1.0] + args.scales
+
+    print(f"{'scale':>6}{'input':>11}{'mean ms':>9}{'p50 ms':>9}{'p99 ms':>9}{'detected':>10}{'error px':>10}{'buffers':>9}")
+    for scale in args.scales:
+        ms, positions, buffers = run_scale(frames, scale, args.roi)
+        if reference is None and scale == 1.0:
+            reference = positions
+        detected = sum(p is not None for p in positions) / len(positions)
+        error = landmark_error(positions, reference)
+        h, w = frames[0].shape[:2]
+        results['scales'][str(scale)] = {
+            'input': [int(w * scale), int(h * scale)],
+            'mean_ms': float(ms.mean()),
+            'p50_ms': float(np.percentile(ms, 50)),
+            'p99_ms': float(np.percentile(ms, 99)),
+            'detection_rate': detected,
+            'landmark_error_px': error,
+            # Inference buffers the detector allocated after warmup (0 in steady state)
+            'buffer_allocations': buffers,
+        }
+        print(f"{scale:>6.2f}{f'{int(w * scale)}x{int(h * scale)}':>11}{ms.mean():>9.2f}"
+              f"{np.percentile(ms, 50):>9.2f}{np.percentile(ms, 99):>9.2f}{detected:>10.0%}"
+              f"{error if error is not None else float('nan'):>10.1f}{buffers if buffers is not None else '-':>9}")
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
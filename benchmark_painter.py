@@ -0,0 +1,257 @@
+# benchmark_painter.py
+"""Headless frame-loop benchmark for the painter.
+
+Drives PainterEngine with scripted hands from SyntheticHandSource (no
+Streamlit, no camera, no MediaPipe) and reports frame-time percentiles and
+allocations per frame for each scenario. Results are written as JSON so runs
+can be compared across commits:
+
+    python benchmark_painter.py --output before.json
+    python benchmark_painter.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+import cv2
+import numpy as np
+from FrameArena import FrameArena
+from FrameSources import SyntheticHandSource
+from PainterEngine import PainterEngine
+
+# Fixed per-frame dt so cursor blinking does not depend on wall-clock time
+FRAME_DT = 1.0 / 30
+
+
+def _draw_script():
+    loop = [(640 + int(300 * np.sin(t)), 420 + int(170 * np.sin(2 * t)))
+            for t in np.linspace(0, 2 * np.pi, 25)]
+    return [{'gesture': 'draw', 'path': loop, 'frames': 240}]
+
+
+def _hover_script():
+    # Two fingers moving around below the header, as when dragging text
+    return [{'gesture': 'select', 'path': [(400, 380), (900, 380), (900, 560), (400, 560), (400, 380)],
+             'frames': 240}]
+
+
+def setup_drawing(engine):
+    engine.drawColor = (255, 0, 255)
+    return _draw_script()
+
+
+def setup_erasing(engine):
+    # Fill the canvas first so the eraser has something to remove
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        p1 = tuple(int(v) for v in rng.integers((0, 125), (1280, 720)))
+        p2 = tuple(int(v) for v in rng.integers((0, 125), (1280, 720)))
+        engine.strokes.add_stroke([p1, p2], (255, 0, 0), 10)
+    engine.drawColor = (0, 0, 0)
+    return _draw_script()
+
+
+def _add_text_objects(engine, count):
+    keyboard_input = engine.keyboard_input
+    rng = np.random.default_rng(1)
+    for i in range(count):
+        keyboard_input.text = f"Note {i}"
+        keyboard_input.current_input_position = tuple(int(v) for v in rng.integers((20, 160), (1150, 700)))
+        keyboard_input.add_text_object()
+    keyboard_input.text = ""
+    keyboard_input.current_input_position = (640, 360)
+
+
+def setup_many_text(engine):
+    _add_text_objects(engine, 50)
+    return _draw_script()
+
+
+def setup_annotations(engine):
+    # A lesson with hundreds of labels, erased where the eraser passes over them
+    _add_text_objects(engine, 500)
+    engine.drawColor = (0, 0, 0)
+    return _draw_script()
+
+
+def setup_dense_text(engine):
+    # More labels than the shared text sprite cache holds (512), all drawn every frame
+    _add_text_objects(engine, 800)
+    engine.drawColor = (255, 0, 255)
+    return _draw_script()
+
+
+def setup_guide(engine):
+    engine.show_guide = True
+    engine.current_guide_index = 0
+    engine.current_guide = engine.guideList[0]
+    return _draw_script()
+
+
+def setup_keyboard(engine):
+    _add_text_objects(engine, 10)
+    engine.keyboard_input.active = True
+    engine.keyboard_input.text = "Typing a label"
+    return _hover_script()
+
+
+def setup_header(engine):
+    # Two fingers resting on Undo and then sweeping across the color tools;
+    # each tool should act once per hover, not once per frame
+    for i in range(10):
+        engine.begin_edit()
+        engine.strokes.add_stroke([(100 + 100 * i, 200), (150 + 100 * i, 600)], (255, 0, 255), 10)
+        engine.end_edit()
+    return [{'gesture': 'select', 'path': [(830, 60), (835, 65), (830, 60)], 'frames': 120},
+            {'gesture': 'select', 'path': [(150, 60), (700, 60), (150, 60)], 'frames': 120}]
+
+
+def setup_offline(engine):
+    # Landmarks only: no camera frame, no compositing (PainterEngine.process with img=None)
+    return _draw_script()
+
+
+SCENARIOS = {
+    'drawing': setup_drawing,
+    'erasing': setup_erasing,
+    'many_text': setup_many_text,
+    'annotations': setup_annotations,
+    'dense_text': setup_dense_text,
+    'guide': setup_guide,
+    'keyboard': setup_keyboard,
+    'header': setup_header,
+    'offline': setup_offline,
+}
+
+
+def frame_step(engine, arena, img, landmarks, fingers):
+    # Same work as the painter's capture and composite stages
+    if img is None:
+        return engine.process(None, landmarks, fingers, dt=FRAME_DT)
+    img = cv2.flip(img, 1, dst=arena.like('flip', img))
+    img = engine.process(img, landmarks, fingers, dt=FRAME_DT)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=arena.like('rgb', img))
+
+
+def _prepare(name, frames, save_dir):
+    engine = PainterEngine(save_dir=save_dir)
+    script = SCENARIOS[name](engine)
+    source = SyntheticHandSource(script=script, n_frames=frames)
+    return engine, FrameArena(), source
+
+
+def _next_frame(name, source):
+    success, img = source.read()
+    if name == 'offline':
+        img = None
+    return success, img
+
+
+def run_scenario(name, frames=240, warmup=20, save_dir=None):
+    """Time ``frames`` frames of a scenario, then measure allocations in a second traced pass."""
+    # Timing pass (untraced, tracemalloc would distort the frame times)
+    engine, arena, source = _prepare(name, frames + warmup, save_dir)
+    times = []
+    for i in range(frames + warmup):
+        success, img = _next_frame(name, source)
+        if not success:
+            break
+        start = time.perf_counter()
+        frame_step(engine, arena, img, source.landmarks, source.fingers)
+        if i >= warmup:
+            times.append(time.perf_counter() - start)
+
+    # Allocation pass: peak transient bytes per frame and bytes retained per frame
+    engine, arena, source = _prepare(name, frames + warmup, save_dir)
+    for _ in range(warmup):
+        success, img = _next_frame(name, source)
+        frame_step(engine, arena, img, source.landmarks, source.fingers)
+    peaks = []
+    arena_start = arena.allocations
+    tracemalloc.start()
+    retained_start = tracemalloc.get_traced_memory()[0]
+    for _ in range(frames):
+        success, img = _next_frame(name, source)
+        if not success:
+            break
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        frame_step(engine, arena, img, source.landmarks, source.fingers)
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    retained = tracemalloc.get_traced_memory()[0] - retained_start
+    tracemalloc.stop()
+
+    ms = np.array(times) * 1000
+    return {
+        'frames': len(times),
+        'mean_ms': float(ms.mean()),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'max_ms': float(ms.max()),
+        'fps': float(1000 / ms.mean()),
+        'alloc_bytes_per_frame': float(np.mean(peaks)),
+        'retained_bytes_per_frame': float(retained / max(len(peaks), 1)),
+        # Frame buffers the arena had to allocate after warmup (0 in steady state)
+        'buffer_allocations': arena.allocations - arena_start,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results, baseline=None):
+    print(f"{'scenario':<12}{'mean ms':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}{'fps':>8}{'alloc MB':>10}{'buffers':>9}")
+    for name, r in results['scenarios'].items():
+        line = (f"{name:<12}{r['mean_ms']:>9.2f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+                f"{r['max_ms']:>9.2f}{r['fps']:>8.1f}{r['alloc_bytes_per_frame'] / 1e6:>10.2f}"
+                f"{r.get('buffer_allocations', 0):>9}")
+        old = (baseline or {}).get('scenarios', {}).get(name)
+        if old:
+            line += f"   p50 {(r['p50_ms'] / old['p50_ms'] - 1) * 100:+.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='Scenario to run (repeatable, default: all)')
+    parser.add_argument('--frames', type=int, default=240)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--output', default='painter_bench.json', help='JSON results file')
+    parser.add_argument('--compare', help='Earlier JSON results to compare against')
+    parser.add_argument('--save-dir', help='Where save gestures write images (default: ~/Pictures)')
+    args = parser.parse_args()
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'opencv': cv2.__version__,
+        'numpy': np.__version__,
+        'scenarios': {},
+    }
+    for name in args.scenario or SCENARIOS:
+        results['scenarios'][name] = run_scenario(name, args.frames, args.warmup, args.save_dir)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()